@@ -0,0 +1,67 @@
+"""Compare the throughput and output size of the HTML extraction engines.
+
+Runs every page of the corpus through each engine and reports the time per
+page, throughput in MB/s of HTML and the size of the produced markdown.
+
+Usage:
+    uv run python benchmarks/bench_extract.py [--engines readability fast] [--repeat 5] [--scale 1 20]
+
+--scale N also benchmarks each page with its <body> repeated N times, to show
+how the engines behave on very large pages.
+"""
+
+import argparse
+import re
+import statistics
+import time
+from pathlib import Path
+
+from mcp_server_fetch.extract import extract_content
+
+CORPUS = Path(__file__).parent / "corpus"
+
+
+def scale_page(html: str, factor: int) -> str:
+    """Repeat the body of a page to build a larger document."""
+    if factor == 1:
+        return html
+    match = re.search(r"<body[^>]*>(.*)</body>", html, re.S | re.I)
+    if match is None:
+        return html * factor
+    return html[: match.start(1)] + match.group(1) * factor + html[match.end(1) :]
+
+
+def bench(html: str, engine: str, repeat: int) -> tuple[float, int]:
+    timings = []
+    output = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = extract_content(html, engine)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), len(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=["readability", "fast"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 20])
+    args = parser.parse_args()
+
+    print(f"{'page':<28}{'engine':<13}{'html KB':>9}{'ms':>10}{'MB/s':>8}{'md chars':>10}{'ratio':>8}")
+    for path in sorted(CORPUS.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        for factor in args.scale:
+            page = scale_page(html, factor)
+            name = path.stem if factor == 1 else f"{path.stem} x{factor}"
+            for engine in args.engines:
+                seconds, chars = bench(page, engine, args.repeat)
+                size = len(page.encode("utf-8"))
+                print(
+                    f"{name:<28}{engine:<13}{size / 1024:>9.1f}{seconds * 1000:>10.1f}"
+                    f"{size / seconds / 1e6:>8.2f}{chars:>10}{chars / len(page):>8.1%}"
+                )
+
+
+if __name__ == "__main__":
+    main()
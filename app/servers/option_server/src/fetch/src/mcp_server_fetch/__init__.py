@@ -1,4 +1,24 @@
-from .server import serve
+from .cache import (
+    DEFAULT_RESPONSE_CACHE_BYTES,
+    DEFAULT_ROBOTS_CACHE_SIZE,
+    DEFAULT_ROBOTS_CACHE_TTL,
+)
+from .disk_cache import DEFAULT_DISK_CACHE_BYTES, DEFAULT_DISK_CACHE_TTL
+from .extract import (
+    DEFAULT_EXTRACTION_ENGINE,
+    DEFAULT_EXTRACTION_TIMEOUT,
+    DEFAULT_FAST_EXTRACTION_THRESHOLD,
+    EXTRACTION_ENGINES,
+)
+from .server import (
+    DEFAULT_FETCH_MANY_TIMEOUT,
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_MAX_CONCURRENT_FETCHES,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_CONNECTIONS_PER_HOST,
+    DEFAULT_MAX_RESPONSE_BYTES,
+    serve,
+)
 
 
 def main():
@@ -16,9 +36,138 @@ def main():
         help="Ignore robots.txt restrictions",
     )
     parser.add_argument("--proxy-url", type=str, help="Proxy URL to use for requests")
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 when the server supports it (requires mcp-server-fetch[http2])",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=DEFAULT_MAX_CONNECTIONS,
+        help="Maximum number of pooled connections",
+    )
+    parser.add_argument(
+        "--max-connections-per-host",
+        type=int,
+        default=DEFAULT_MAX_CONNECTIONS_PER_HOST,
+        help="Maximum number of concurrent requests to a single host",
+    )
+    parser.add_argument(
+        "--keepalive-expiry",
+        type=float,
+        default=DEFAULT_KEEPALIVE_EXPIRY,
+        help="Seconds to keep idle connections open for reuse",
+    )
+    parser.add_argument(
+        "--robots-cache-size",
+        type=int,
+        default=DEFAULT_ROBOTS_CACHE_SIZE,
+        help="Maximum number of sites whose robots.txt is cached (0 disables the cache)",
+    )
+    parser.add_argument(
+        "--robots-cache-ttl",
+        type=float,
+        default=DEFAULT_ROBOTS_CACHE_TTL,
+        help="Seconds to cache a robots.txt that does not specify its own lifetime",
+    )
+    parser.add_argument(
+        "--response-cache-mb",
+        type=float,
+        default=DEFAULT_RESPONSE_CACHE_BYTES / (1024 * 1024),
+        help="Memory budget in MB for cached responses (0 disables the cache)",
+    )
+    parser.add_argument(
+        "--extraction-workers",
+        type=int,
+        help="Number of worker processes converting HTML to markdown (default: CPU count)",
+    )
+    parser.add_argument(
+        "--extraction-timeout",
+        type=float,
+        default=DEFAULT_EXTRACTION_TIMEOUT,
+        help="Seconds allowed to convert a single page to markdown",
+    )
+    parser.add_argument(
+        "--max-concurrent-extractions",
+        type=int,
+        help="Maximum number of pages converted at once (default: number of workers)",
+    )
+    parser.add_argument(
+        "--extractor",
+        choices=EXTRACTION_ENGINES,
+        default=DEFAULT_EXTRACTION_ENGINE,
+        help="Engine converting HTML to markdown: Readability.js, the in-process fast extractor, "
+        "or auto to use the fast extractor for large pages or when Node.js is missing",
+    )
+    parser.add_argument(
+        "--fast-extractor-threshold",
+        type=int,
+        default=DEFAULT_FAST_EXTRACTION_THRESHOLD,
+        help="Page size in characters from which the auto extractor uses the fast extractor",
+    )
+    parser.add_argument(
+        "--max-response-mb",
+        type=float,
+        default=DEFAULT_MAX_RESPONSE_BYTES / (1024 * 1024),
+        help="Maximum size in MB of a response body, larger responses are truncated",
+    )
+    parser.add_argument(
+        "--max-concurrent-fetches",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENT_FETCHES,
+        help="Maximum number of URLs the fetch_many tool downloads at once",
+    )
+    parser.add_argument(
+        "--fetch-many-timeout",
+        type=float,
+        default=DEFAULT_FETCH_MANY_TIMEOUT,
+        help="Seconds the fetch_many tool waits for the URLs of one call",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Directory for a persistent cache of fetched and simplified pages that survives restarts",
+    )
+    parser.add_argument(
+        "--disk-cache-mb",
+        type=float,
+        default=DEFAULT_DISK_CACHE_BYTES / (1024 * 1024),
+        help="Size budget in MB of the persistent cache (compressed)",
+    )
+    parser.add_argument(
+        "--disk-cache-ttl",
+        type=float,
+        default=DEFAULT_DISK_CACHE_TTL,
+        help="Seconds a page is kept in the persistent cache",
+    )
 
     args = parser.parse_args()
-    asyncio.run(serve(args.user_agent, args.ignore_robots_txt, args.proxy_url))
+    asyncio.run(
+        serve(
+            args.user_agent,
+            args.ignore_robots_txt,
+            args.proxy_url,
+            http2=args.http2,
+            max_connections=args.max_connections,
+            max_connections_per_host=args.max_connections_per_host,
+            keepalive_expiry=args.keepalive_expiry,
+            robots_cache_size=args.robots_cache_size,
+            robots_cache_ttl=args.robots_cache_ttl,
+            response_cache_bytes=int(args.response_cache_mb * 1024 * 1024),
+            extraction_workers=args.extraction_workers,
+            extraction_timeout=args.extraction_timeout,
+            max_concurrent_extractions=args.max_concurrent_extractions,
+            extraction_engine=args.extractor,
+            fast_extraction_threshold=args.fast_extractor_threshold,
+            max_response_bytes=int(args.max_response_mb * 1024 * 1024),
+            max_concurrent_fetches=args.max_concurrent_fetches,
+            fetch_many_timeout=args.fetch_many_timeout,
+            cache_dir=args.cache_dir,
+            disk_cache_bytes=int(args.disk_cache_mb * 1024 * 1024),
+            disk_cache_ttl=args.disk_cache_ttl,
+        )
+    )
 
 
 if __name__ == "__main__":
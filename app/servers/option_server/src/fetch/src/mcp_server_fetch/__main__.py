@@ -2,4 +2,6 @@
 
 from mcp_server_fetch import main
 
-main()
+# Guarded so that extraction worker processes can import this module
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Mapping
+
+from protego import Protego
+
+from .disk_cache import DiskCache
+
+DEFAULT_ROBOTS_CACHE_SIZE = 256
+DEFAULT_ROBOTS_CACHE_TTL = 3600.0
+# RFC 9309 asks crawlers not to use a cached robots.txt for more than 24 hours
+MAX_ROBOTS_CACHE_TTL = 24 * 3600.0
+
+
+def parse_cache_control(headers: Mapping[str, str]) -> dict[str, str | None]:
+    """Parse the Cache-Control header into a mapping of lower-cased directives.
+
+    Args:
+        headers: Response headers
+
+    Returns:
+        Directive names mapped to their value, or None for valueless directives
+    """
+    directives: dict[str, str | None] = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip().strip('"') if value else None
+    return directives
+
+
+def get_freshness_lifetime(
+    headers: Mapping[str, str], default: float | None = None
+) -> float | None:
+    """Get how many seconds a response may be reused without revalidation.
+
+    Cache-Control max-age takes precedence over Expires, as in RFC 9111.
+
+    Args:
+        headers: Response headers
+        default: Value to return when the response states no lifetime
+
+    Returns:
+        Freshness lifetime in seconds, 0 if the response must not be reused
+        without revalidation, or the default
+    """
+    directives = parse_cache_control(headers)
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    max_age = directives.get("max-age")
+    if max_age is not None:
+        try:
+            return max(float(max_age), 0.0)
+        except ValueError:
+            return 0.0
+    expires = headers.get("expires")
+    if expires is not None:
+        try:
+            expires_at = parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            # An invalid Expires value means "already expired"
+            return 0.0
+        try:
+            now = parsedate_to_datetime(headers["date"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            now = time.time()
+        return max(expires_at - now, 0.0)
+    return default
+
+
+@dataclass
+class RobotsEntry:
+    """Outcome of fetching the robots.txt of one origin."""
+
+    robots_url: str
+    status_code: int
+    robots_txt: str
+    # None when every path may be fetched, e.g. the robots.txt does not exist
+    parser: Protego | None
+    expires_at: float = 0.0
+
+
+class RobotsCache:
+    """Bounded LRU cache of parsed robots.txt files, keyed by origin."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_ROBOTS_CACHE_SIZE,
+        default_ttl: float = DEFAULT_ROBOTS_CACHE_TTL,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[str, RobotsEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, origin: str) -> RobotsEntry | None:
+        entry = self._entries.get(origin)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[origin]
+            return None
+        self._entries.move_to_end(origin)
+        return entry
+
+    def put(self, origin: str, entry: RobotsEntry, headers: Mapping[str, str]) -> None:
+        """Store the robots.txt of an origin for as long as its headers allow."""
+        ttl = get_freshness_lifetime(headers, self.default_ttl) or 0.0
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        entry.expires_at = time.monotonic() + min(ttl, MAX_ROBOTS_CACHE_TTL)
+        self._entries[origin] = entry
+        self._entries.move_to_end(origin)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+DEFAULT_RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+# Upper bound for lifetimes guessed from Last-Modified (RFC 9111, section 4.2.2)
+MAX_HEURISTIC_LIFETIME = 24 * 3600.0
+# Headers of a 304 response that describe the (empty) message, not the stored content
+NOT_MODIFIED_IGNORED_HEADERS = {"content-length", "content-encoding", "transfer-encoding"}
+
+
+@dataclass
+class CachedResponse:
+    """A successful response kept for reuse, together with its validators."""
+
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+    encoding: str | None
+    expires_at: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Request headers that ask the origin whether this copy is still current."""
+        validators = {}
+        if "etag" in self.headers:
+            validators["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["last-modified"]
+        return validators
+
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+
+def get_heuristic_lifetime(headers: Mapping[str, str]) -> float:
+    """Guess a freshness lifetime as 10% of the time since Last-Modified."""
+    try:
+        last_modified = parsedate_to_datetime(headers["last-modified"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+    return min(max(time.time() - last_modified, 0.0) / 10, MAX_HEURISTIC_LIFETIME)
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of HTTP responses supporting conditional revalidation.
+
+    Fresh entries are served without touching the network. Stale entries that
+    carry an ETag or Last-Modified validator are kept so the next request can
+    revalidate them, which costs a 304 instead of a full download.
+
+    With a DiskCache, responses are also written to disk and loaded from there
+    when they are not in memory, e.g. after a restart.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_RESPONSE_CACHE_BYTES,
+        disk: DiskCache | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.disk = disk
+        # A single entry may not take more than an eighth of the cache
+        self.max_entry_bytes = max_bytes // 8
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str, str], CachedResponse] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+        }
+
+    async def get(self, url: str, user_agent: str) -> CachedResponse | None:
+        """Get the stored response for a URL, fresh or stale."""
+        entry = self._entries.get((url, user_agent))
+        if entry is not None:
+            self._entries.move_to_end((url, user_agent))
+        else:
+            entry = await self._load(url, user_agent)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.is_fresh():
+            self.hits += 1
+        return entry
+
+    def put(
+        self,
+        url: str,
+        user_agent: str,
+        status_code: int,
+        headers: Mapping[str, str],
+        content: bytes,
+        encoding: str | None,
+    ) -> CachedResponse | None:
+        """Store a response if its headers allow reuse, and return the stored entry."""
+        if (url, user_agent) in self._entries:
+            # A stale entry was replaced by a full download
+            self.misses += 1
+            self.discard(url, user_agent)
+        entry = CachedResponse(
+            url=url,
+            status_code=status_code,
+            headers={k.lower(): v for k, v in headers.items()},
+            content=content,
+            encoding=encoding,
+        )
+        # Entries too large for memory may still be written to disk
+        if "no-store" in parse_cache_control(entry.headers):
+            return None
+        lifetime = get_freshness_lifetime(entry.headers)
+        if lifetime is None:
+            lifetime = get_heuristic_lifetime(entry.headers)
+        if lifetime <= 0 and not entry.validators:
+            return None
+        entry.expires_at = time.monotonic() + lifetime
+        if self.disk is not None:
+            self.disk.put(
+                self._disk_key(url, user_agent),
+                entry.content,
+                self._disk_metadata(entry),
+            )
+        self._remember(url, user_agent, entry)
+        return entry
+
+    async def revalidated(
+        self, url: str, user_agent: str, headers: Mapping[str, str]
+    ) -> CachedResponse | None:
+        """Refresh a stored response after the origin answered 304 Not Modified."""
+        stored = (url, user_agent) in self._entries
+        entry = self._entries.get((url, user_agent)) or await self._load(url, user_agent)
+        if entry is None:
+            return None
+        if stored:
+            self.current_bytes -= entry.size
+        entry.headers.update({
+            k.lower(): v for k, v in headers.items()
+            if k.lower() not in NOT_MODIFIED_IGNORED_HEADERS
+        })
+        if stored:
+            self.current_bytes += entry.size
+        lifetime = get_freshness_lifetime(entry.headers)
+        if lifetime is None:
+            lifetime = get_heuristic_lifetime(entry.headers)
+        entry.expires_at = time.monotonic() + lifetime
+        if self.disk is not None:
+            self.disk.update_metadata(self._disk_key(url, user_agent), self._disk_metadata(entry))
+        self.revalidations += 1
+        return entry
+
+    def discard(self, url: str, user_agent: str) -> None:
+        entry = self._entries.pop((url, user_agent), None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+        if self.disk is not None:
+            self.disk.delete(self._disk_key(url, user_agent))
+
+    def _remember(self, url: str, user_agent: str, entry: CachedResponse) -> None:
+        if entry.size > self.max_entry_bytes:
+            return
+        self._entries[(url, user_agent)] = entry
+        self.current_bytes += entry.size
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+            self.evictions += 1
+
+    @staticmethod
+    def _disk_key(url: str, user_agent: str) -> str:
+        return f"response\0{url}\0{user_agent}"
+
+    @staticmethod
+    def _disk_metadata(entry: CachedResponse) -> dict:
+        # Monotonic clocks do not survive a restart, so store wall-clock expiry
+        return {
+            "url": entry.url,
+            "status_code": entry.status_code,
+            "headers": entry.headers,
+            "encoding": entry.encoding,
+            "expires_at": time.time() + entry.expires_at - time.monotonic(),
+        }
+
+    async def _load(self, url: str, user_agent: str) -> CachedResponse | None:
+        if self.disk is None:
+            return None
+        stored = await self.disk.aget(self._disk_key(url, user_agent))
+        if stored is None:
+            return None
+        content, metadata = stored
+        entry = CachedResponse(
+            url=metadata["url"],
+            status_code=metadata["status_code"],
+            headers=metadata["headers"],
+            content=content,
+            encoding=metadata["encoding"],
+            expires_at=time.monotonic() + metadata["expires_at"] - time.time(),
+        )
+        self._remember(url, user_agent, entry)
+        return entry
+
+
+DEFAULT_PAGE_CACHE_CHARS = 32 * 1024 * 1024
+DEFAULT_PAGE_CACHE_TTL = 600.0
+
+
+@dataclass
+class CachedPage:
+    """Content already prepared for the LLM, kept around for paginated reads."""
+
+    url: str
+    raw: bool
+    content: str
+    prefix: str
+    expires_at: float = 0.0
+
+
+class PageCache:
+    """Bounded LRU cache of prepared pages, keyed by continuation token.
+
+    When the fetch tool truncates its output it hands out the token of the
+    page, so the next window can be sliced from memory instead of fetching and
+    extracting the whole page again.
+    """
+
+    def __init__(
+        self,
+        max_chars: int = DEFAULT_PAGE_CACHE_CHARS,
+        ttl: float = DEFAULT_PAGE_CACHE_TTL,
+    ):
+        self.max_chars = max_chars
+        self.ttl = ttl
+        self.current_chars = 0
+        self._entries: OrderedDict[str, CachedPage] = OrderedDict()
+        self._tokens: dict[tuple[str, bool], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_token(url: str, raw: bool, content: str) -> str:
+        digest = hashlib.sha256(f"{url}\0{raw}\0".encode())
+        digest.update(content.encode("utf-8", errors="surrogatepass"))
+        return digest.hexdigest()[:24]
+
+    def get(self, token: str) -> CachedPage | None:
+        page = self._entries.get(token)
+        if page is None:
+            return None
+        if page.expires_at <= time.monotonic():
+            self._remove(token)
+            return None
+        self._entries.move_to_end(token)
+        return page
+
+    def find(self, url: str, raw: bool) -> tuple[str, CachedPage] | None:
+        """Find the most recent page prepared for a URL."""
+        token = self._tokens.get((url, raw))
+        if token is None:
+            return None
+        page = self.get(token)
+        return (token, page) if page is not None else None
+
+    def put(self, url: str, raw: bool, content: str, prefix: str) -> str:
+        """Store a prepared page and return its continuation token."""
+        token = self.make_token(url, raw, content)
+        previous = self._tokens.get((url, raw))
+        if previous is not None:
+            self._remove(previous)
+        if len(content) > self.max_chars:
+            return token
+        self._entries[token] = CachedPage(
+            url=url,
+            raw=raw,
+            content=content,
+            prefix=prefix,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self._tokens[(url, raw)] = token
+        self.current_chars += len(content)
+        while self.current_chars > self.max_chars:
+            self._remove(next(iter(self._entries)))
+        return token
+
+    def _remove(self, token: str) -> None:
+        page = self._entries.pop(token, None)
+        if page is None:
+            return
+        self.current_chars -= len(page.content)
+        if self._tokens.get((page.url, page.raw)) == token:
+            del self._tokens[(page.url, page.raw)]
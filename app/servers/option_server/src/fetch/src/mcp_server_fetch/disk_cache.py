@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+DEFAULT_DISK_CACHE_BYTES = 512 * 1024 * 1024
+DEFAULT_DISK_CACHE_TTL = 7 * 24 * 3600.0
+DISK_CACHE_FILENAME = "fetch-cache.sqlite3"
+# Reads only refresh the LRU position of an entry once per this many seconds
+ACCESS_RESOLUTION = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    metadata TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+-- Running total of the entry sizes, kept by triggers so eviction does not sum every row
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals SELECT 0, COALESCE(SUM(size), 0) FROM entries;
+CREATE TRIGGER IF NOT EXISTS entries_inserted AFTER INSERT ON entries BEGIN
+    UPDATE totals SET size = size + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_deleted AFTER DELETE ON entries BEGIN
+    UPDATE totals SET size = size - OLD.size;
+END;
+"""
+
+
+class DiskCache:
+    """Persistent key-value store for fetched and extracted documents.
+
+    Values are zlib-compressed and kept in a SQLite database, so a restarted
+    server starts out with the pages it fetched before. Entries are dropped
+    once their TTL has passed, and the least recently used ones are evicted
+    when the compressed values exceed the size budget.
+
+    Writes go to a single background thread, and lookups from async code go
+    through aget, which runs them in a single reader thread, so neither SQLite
+    nor zlib holds up the event loop.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        max_bytes: int = DEFAULT_DISK_CACHE_BYTES,
+        ttl: float = DEFAULT_DISK_CACHE_TTL,
+    ):
+        self.path = Path(directory).expanduser() / DISK_CACHE_FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # A single entry may not take more than an eighth of the cache
+        self.max_entry_bytes = max_bytes // 8
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fetch-disk-cache")
+        self._reader = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="fetch-disk-cache-reader"
+        )
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+            db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            # Readers do not block the writer, and other server processes may share the file
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key: str) -> tuple[bytes, dict[str, Any]] | None:
+        """Get a stored value and its metadata, or None if missing or expired."""
+        now = time.time()
+        row = self._connect().execute(
+            "SELECT value, metadata, accessed_at FROM entries WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        if row is None:
+            return None
+        value, metadata, accessed_at = row
+        if now - accessed_at > ACCESS_RESOLUTION:
+            self._writer.submit(self._touch, key, now)
+        try:
+            return zlib.decompress(value), json.loads(metadata)
+        except (zlib.error, ValueError):
+            self.delete(key)
+            return None
+
+    async def aget(self, key: str) -> tuple[bytes, dict[str, Any]] | None:
+        """Like get, but read and decompress the value in the reader thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._reader, self.get, key)
+
+    def put(
+        self,
+        key: str,
+        value: bytes,
+        metadata: dict[str, Any] | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        """Store a value in the background, replacing any previous value of the key."""
+        self._writer.submit(self._put, key, value, metadata or {}, ttl or self.ttl)
+
+    def update_metadata(self, key: str, metadata: dict[str, Any]) -> None:
+        """Merge new metadata into a stored entry in the background."""
+        self._writer.submit(self._update_metadata, key, metadata)
+
+    def delete(self, key: str) -> None:
+        self._writer.submit(self._delete, key)
+
+    def flush(self) -> None:
+        """Wait until every pending write has been stored."""
+        self._writer.submit(lambda: None).result()
+
+    def close(self) -> None:
+        for executor in (self._reader, self._writer):
+            executor.submit(self._disconnect)
+            executor.shutdown(wait=True)
+        self._disconnect()
+
+    def _disconnect(self) -> None:
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    @property
+    def stats(self) -> dict[str, int]:
+        entries, size = self._connect().execute(
+            "SELECT (SELECT COUNT(*) FROM entries), size FROM totals"
+        ).fetchone()
+        return {"entries": entries, "bytes": size}
+
+    def _put(self, key: str, value: bytes, metadata: dict[str, Any], ttl: float) -> None:
+        compressed = zlib.compress(value)
+        if len(compressed) > self.max_entry_bytes:
+            self._delete(key)
+            return
+        now = time.time()
+        with self._connect() as db:
+            # Replacing a row with INSERT OR REPLACE would not run the delete trigger
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            db.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, compressed, json.dumps(metadata), len(compressed), now + ttl, now),
+            )
+            self._evict(db, now)
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        (total,) = db.execute("SELECT size FROM totals").fetchone()
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def _update_metadata(self, key: str, metadata: dict[str, Any]) -> None:
+        with self._connect() as db:
+            row = db.execute("SELECT metadata FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE entries SET metadata = ? WHERE key = ?",
+                    (json.dumps({**json.loads(row[0]), **metadata}), key),
+                )
+
+    def _touch(self, key: str, now: float) -> None:
+        with self._connect() as db:
+            db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+    def _delete(self, key: str) -> None:
+        with self._connect() as db:
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
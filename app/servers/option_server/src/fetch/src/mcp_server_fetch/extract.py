@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import shutil
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import markdownify
+import readabilipy.simple_json
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData, INTERNAL_ERROR
+
+from .disk_cache import DiskCache
+from .fast_extract import extract_content_fast
+
+DEFAULT_EXTRACTION_TIMEOUT = 60.0
+EXTRACTION_ENGINES = ("auto", "readability", "fast")
+DEFAULT_EXTRACTION_ENGINE = "auto"
+# In auto mode, pages larger than this many characters use the fast extractor
+DEFAULT_FAST_EXTRACTION_THRESHOLD = 512 * 1024
+
+
+def extract_content_from_html(html: str) -> str:
+    """Extract and convert HTML content to Markdown format.
+
+    Args:
+        html: Raw HTML content to process
+
+    Returns:
+        Simplified markdown version of the content
+    """
+    ret = readabilipy.simple_json.simple_json_from_html_string(
+        html, use_readability=True
+    )
+    if not ret["content"]:
+        return "<error>Page failed to be simplified from HTML</error>"
+    content = markdownify.markdownify(
+        ret["content"],
+        heading_style=markdownify.ATX,
+    )
+    return content
+
+
+def resolve_engine(
+    html: str,
+    engine: str = DEFAULT_EXTRACTION_ENGINE,
+    fast_threshold: int = DEFAULT_FAST_EXTRACTION_THRESHOLD,
+) -> str:
+    """Get the engine that extract_content uses for a page, "readability" or "fast"."""
+    if engine == "auto":
+        use_fast = len(html) > fast_threshold or shutil.which("node") is None
+        return "fast" if use_fast else "readability"
+    return engine
+
+
+def extract_content(
+    html: str,
+    engine: str = DEFAULT_EXTRACTION_ENGINE,
+    fast_threshold: int = DEFAULT_FAST_EXTRACTION_THRESHOLD,
+) -> str:
+    """Extract and convert HTML content to Markdown format with the chosen engine.
+
+    Args:
+        html: Raw HTML content to process
+        engine: "readability" for Readability.js, "fast" for the in-process
+            extractor, or "auto" to use the fast extractor for pages larger than
+            fast_threshold characters or when Node.js is not available
+        fast_threshold: Page size from which "auto" picks the fast extractor
+
+    Returns:
+        Simplified markdown version of the content
+    """
+    if resolve_engine(html, engine, fast_threshold) == "fast":
+        return extract_content_fast(html)
+    return extract_content_from_html(html)
+
+
+def _start_worker(pids) -> None:
+    # Lead a process group, so a stuck worker can be killed together with the
+    # Node process Readability.js runs in
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    pids.put(os.getpid())
+
+
+def _kill_worker(pid: int) -> None:
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(pid, signal.SIGKILL)
+        else:
+            os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+class ExtractionPool:
+    """Runs HTML extraction in a pool of worker processes, off the event loop.
+
+    Extraction is CPU bound (and may run Readability.js through Node), so doing
+    it inline would stall every other request served by the process. The pool
+    lets several documents be converted at once on multiple cores.
+
+    With a DiskCache, results are stored under the hash of the HTML and the
+    engine, so a page that did not change is converted only once.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        timeout: float = DEFAULT_EXTRACTION_TIMEOUT,
+        max_concurrency: int | None = None,
+        engine: str = DEFAULT_EXTRACTION_ENGINE,
+        fast_threshold: int = DEFAULT_FAST_EXTRACTION_THRESHOLD,
+        disk: DiskCache | None = None,
+    ):
+        self.engine = engine
+        self.disk = disk
+        self.fast_threshold = fast_threshold
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        # Documents beyond this limit wait here instead of queueing up inside the pool
+        self.max_concurrency = max_concurrency or self.max_workers
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor: ProcessPoolExecutor | None = None
+        # Workers report their PID here once they lead their process group
+        self._worker_pids = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process that runs an event loop and threads is unsafe
+            context = multiprocessing.get_context("spawn")
+            self._worker_pids = context.SimpleQueue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_start_worker,
+                initargs=(self._worker_pids,),
+            )
+        return self._executor
+
+    def _discard_executor(self) -> None:
+        # A timed out worker cannot be interrupted, so the whole pool is killed
+        # and new documents go to a fresh one. Documents still being converted
+        # by the other workers fail like after a crash.
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        pids = []
+        while not self._worker_pids.empty():
+            pids.append(self._worker_pids.get())
+        self._worker_pids.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+        for pid in pids:
+            _kill_worker(pid)
+
+    async def extract(self, html: str) -> str:
+        """Extract and convert HTML content to Markdown format in a worker process.
+
+        Raises a McpError if the document takes longer than the timeout.
+        """
+        if self.disk is None:
+            return await self._extract(html)
+        engine = resolve_engine(html, self.engine, self.fast_threshold)
+        digest = hashlib.sha256(html.encode("utf-8", errors="surrogatepass")).hexdigest()
+        key = f"document\0{engine}\0{digest}"
+        stored = await self.disk.aget(key)
+        if stored is not None:
+            return stored[0].decode("utf-8")
+        content = await self._extract(html, engine)
+        self.disk.put(key, content.encode("utf-8", errors="surrogatepass"))
+        return content
+
+    async def _extract(self, html: str, engine: str | None = None) -> str:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(
+                        executor,
+                        extract_content,
+                        html,
+                        engine or self.engine,
+                        self.fast_threshold,
+                    ),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError:
+                if executor is self._executor:
+                    self._discard_executor()
+                raise McpError(ErrorData(
+                    code=INTERNAL_ERROR,
+                    message=f"Simplifying the page to markdown took longer than {self.timeout:g} seconds, try fetching the raw content instead",
+                ))
+            except BrokenProcessPool:
+                if executor is self._executor:
+                    self._discard_executor()
+                raise McpError(ErrorData(
+                    code=INTERNAL_ERROR,
+                    message="The worker simplifying the page to markdown crashed, try fetching the raw content instead",
+                ))
+
+    def close(self) -> None:
+        # Waiting for the workers would hang on one stuck in a document
+        self._discard_executor()
@@ -0,0 +1,364 @@
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+# Subtrees that never hold readable content
+SKIPPED_TAGS = {
+    "aside", "button", "canvas", "dialog", "embed", "footer", "form", "head",
+    "iframe", "math", "nav", "noscript", "object", "script", "select", "style",
+    "svg", "template", "textarea",
+}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+BLOCK_TAGS = {
+    "address", "article", "center", "dd", "details", "div", "dl", "dt",
+    "figcaption", "figure", "header", "main", "p", "section", "summary",
+}
+# Opening one of the keys implicitly closes an open element listed in its value
+IMPLIED_END_TAGS = {
+    "p": {"p"},
+    "li": {"li", "p"},
+    "dt": {"dt", "dd", "p"},
+    "dd": {"dt", "dd", "p"},
+    "tr": {"tr", "td", "th"},
+    "td": {"td", "th"},
+    "th": {"td", "th"},
+}
+# Words in a class or id that mark navigation, ads and other page furniture
+BOILERPLATE_WORDS = {
+    "ad", "ads", "advert", "advertisement", "banner", "breadcrumb", "breadcrumbs",
+    "comment", "comments", "consent", "cookie", "cookies", "footer", "headerlink",
+    "masthead", "menu", "modal", "nav", "navbar", "navigation", "newsletter",
+    "pagination", "popup", "promo", "related", "share", "sharing", "sidebar",
+    "skip", "social", "sponsored", "subscribe", "toolbar",
+}
+BOILERPLATE_ROLES = {"banner", "complementary", "contentinfo", "dialog", "navigation", "search"}
+# Containers below which boilerplate heuristics must not apply
+ROOT_TAGS = {"html", "body", "main", "article"}
+
+WHITESPACE = re.compile(r"\s+")
+WORD_SEPARATOR = re.compile(r"[\s_-]+")
+
+
+@dataclass
+class _Element:
+    tag: str
+    attrs: dict[str, str]
+    # Whether this element starts a skipped subtree
+    skip: bool = False
+    # Whether the element was opened outside any skipped subtree
+    active: bool = True
+    # Whether this element is the main content of the page (<main>, <article>)
+    content: bool = False
+    buffer: list[str] | None = None
+
+
+@dataclass
+class _Table:
+    rows: list[list[str]] = field(default_factory=list)
+    has_header: bool = False
+
+
+class _MarkdownBuilder(HTMLParser):
+    """Streaming HTML tokenizer that drops page furniture and writes markdown.
+
+    Text is emitted as tags are tokenized; only constructs that need their whole
+    content to be formatted (links, headings, list items, table cells, ...) are
+    buffered until they close.
+    """
+
+    def __init__(self, use_heuristics: bool = True):
+        super().__init__(convert_charrefs=True)
+        self.use_heuristics = use_heuristics
+        self._stack: list[_Element] = []
+        self._skipping = 0
+        self._content_depth = 0
+        self._pre_depth = 0
+        self._lists: list[list[int | None]] = []
+        self._tables: list[_Table] = []
+        # Top level output as (chunk, emitted inside <main>/<article>) pairs
+        self._chunks: list[tuple[str, bool]] = []
+        self._buffers: list[list[str]] = []
+        self._last = "\n"
+
+    # Output
+
+    def _write(self, text: str) -> None:
+        if not text:
+            return
+        if self._buffers:
+            self._buffers[-1].append(text)
+        else:
+            self._chunks.append((text, self._content_depth > 0))
+        self._last = text[-1]
+
+    def _write_text(self, text: str) -> None:
+        if not self._pre_depth:
+            text = WHITESPACE.sub(" ", text)
+            if self._last in " \n":
+                text = text.lstrip(" ")
+        self._write(text)
+
+    def _block(self) -> None:
+        if self._buffers:
+            buffer = self._buffers[-1]
+            if buffer and not "".join(buffer[-2:]).endswith("\n\n"):
+                buffer.append("\n\n")
+                self._last = "\n"
+        elif self._chunks and not "".join(c for c, _ in self._chunks[-2:]).endswith("\n\n"):
+            self._write("\n\n")
+
+    def _push_buffer(self, element: _Element) -> None:
+        element.buffer = []
+        self._buffers.append(element.buffer)
+        self._last = "\n"
+
+    def _pop_buffer(self) -> str:
+        text = "".join(self._buffers.pop())
+        self._last = "\n" if not self._buffers or not self._buffers[-1] else self._buffers[-1][-1][-1:]
+        return text
+
+    # Tokenizer callbacks
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        element_attrs = {name: value or "" for name, value in attrs}
+        if tag in VOID_TAGS:
+            if not self._skipping:
+                self._void(tag, element_attrs)
+            return
+        if tag in IMPLIED_END_TAGS:
+            self._close_implied(tag)
+
+        element = _Element(tag, element_attrs)
+        element.skip = self._is_boilerplate(element)
+        self._skipping += element.skip
+        element.active = not self._skipping
+        self._stack.append(element)
+        if element.active:
+            self._start(element)
+
+    def handle_endtag(self, tag: str) -> None:
+        if not any(element.tag == tag for element in self._stack):
+            return
+        while self._stack:
+            element = self._stack.pop()
+            self._end(element)
+            if element.tag == tag:
+                break
+
+    def handle_data(self, data: str) -> None:
+        if not self._skipping:
+            self._write_text(data)
+
+    def close(self) -> None:
+        super().close()
+        while self._stack:
+            self._end(self._stack.pop())
+
+    # Element handling
+
+    def _is_boilerplate(self, element: _Element) -> bool:
+        tag, attrs = element.tag, element.attrs
+        if tag in SKIPPED_TAGS:
+            return True
+        if "hidden" in attrs or attrs.get("aria-hidden") == "true":
+            return True
+        if tag == "header" and not self._content_depth:
+            return True
+        if not self.use_heuristics or tag in ROOT_TAGS:
+            return False
+        if attrs.get("role") in BOILERPLATE_ROLES:
+            return True
+        if "display:none" in attrs.get("style", "").replace(" ", ""):
+            return True
+        words = WORD_SEPARATOR.split(f"{attrs.get('class', '')} {attrs.get('id', '')}".lower())
+        return any(word in BOILERPLATE_WORDS for word in words)
+
+    def _close_implied(self, tag: str) -> None:
+        closes = IMPLIED_END_TAGS[tag]
+        for index in range(len(self._stack) - 1, -1, -1):
+            open_tag = self._stack[index].tag
+            if open_tag in closes:
+                self.handle_endtag(open_tag)
+                return
+            # Do not reach past the container the implied element belongs to
+            if open_tag in ("ul", "ol", "dl", "table", "div", "blockquote"):
+                return
+
+    def _void(self, tag: str, attrs: dict[str, str]) -> None:
+        if tag == "br":
+            self._write("\n")
+        elif tag == "hr":
+            self._block()
+            self._write("---")
+            self._block()
+        elif tag == "img":
+            src = attrs.get("src", "")
+            if src and not src.startswith("data:"):
+                alt = WHITESPACE.sub(" ", attrs.get("alt", "")).strip()
+                self._write(f"![{alt}]({src})")
+
+    def _start(self, element: _Element) -> None:
+        tag = element.tag
+        if tag in ("main", "article") or element.attrs.get("role") == "main":
+            element.content = True
+            self._content_depth += 1
+
+        if tag in BLOCK_TAGS:
+            self._block()
+        elif tag in ("h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "a", "li"):
+            self._push_buffer(element)
+        elif tag in ("strong", "b", "em", "i"):
+            self._push_buffer(element)
+        elif tag == "pre":
+            self._pre_depth += 1
+            self._push_buffer(element)
+        elif tag == "code" and not self._pre_depth:
+            self._write("`")
+        elif tag in ("ul", "ol"):
+            start = element.attrs.get("start", "1")
+            self._lists.append([int(start) if tag == "ol" and start.isdigit() else None])
+            if not self._buffers:
+                self._block()
+            elif self._last != "\n":
+                self._write("\n")
+        elif tag == "table":
+            self._block()
+            self._tables.append(_Table())
+        elif tag == "tr" and self._tables:
+            self._tables[-1].rows.append([])
+        elif tag in ("td", "th"):
+            self._push_buffer(element)
+
+    def _end(self, element: _Element) -> None:
+        if not element.active:
+            self._skipping -= element.skip
+            return
+        tag = element.tag
+        if element.content:
+            self._content_depth -= 1
+
+        if tag in BLOCK_TAGS:
+            self._block()
+        elif tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            text = WHITESPACE.sub(" ", self._pop_buffer()).strip()
+            if text:
+                self._block()
+                self._write(f"{'#' * int(tag[1])} {text}")
+                self._block()
+        elif tag == "a":
+            href = element.attrs.get("href", "")
+            if href and not href.startswith(("#", "javascript:")):
+                self._write_inline(self._pop_buffer(), "[", f"]({href})")
+            else:
+                self._write_inline(self._pop_buffer(), "", "")
+        elif tag in ("strong", "b", "em", "i"):
+            marker = "**" if tag in ("strong", "b") else "*"
+            self._write_inline(self._pop_buffer(), marker, marker)
+        elif tag == "pre":
+            self._pre_depth -= 1
+            code = self._pop_buffer().strip("\n")
+            if code.strip():
+                self._block()
+                self._write(f"```\n{code}\n```")
+                self._block()
+        elif tag == "code" and not self._pre_depth:
+            self._write("`")
+        elif tag == "blockquote":
+            text = self._pop_buffer().strip()
+            if text:
+                self._block()
+                self._write("\n".join(f"> {line}".rstrip() for line in text.splitlines()))
+                self._block()
+        elif tag == "li":
+            self._end_list_item()
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            if not self._buffers:
+                self._block()
+        elif tag in ("td", "th"):
+            text = WHITESPACE.sub(" ", self._pop_buffer()).strip().replace("|", "\\|")
+            if self._tables:
+                table = self._tables[-1]
+                if not table.rows:
+                    table.rows.append([])
+                table.rows[-1].append(text)
+                table.has_header |= tag == "th" and len(table.rows) == 1
+        elif tag == "table" and self._tables:
+            self._write_table(self._tables.pop())
+
+    def _write_inline(self, text: str, opening: str, closing: str) -> None:
+        if not text.strip():
+            return
+        # Keep the spacing around the element outside of the markup
+        leading = " " if text[0].isspace() and self._last not in " \n" else ""
+        trailing = " " if text[-1].isspace() else ""
+        self._write(f"{leading}{opening}{text.strip()}{closing}{trailing}")
+
+    def _end_list_item(self) -> None:
+        lines = [line.rstrip() for line in self._pop_buffer().strip().splitlines() if line.strip()]
+        if not lines:
+            return
+        counter = self._lists[-1] if self._lists else [None]
+        if counter[0] is None:
+            marker = "- "
+        else:
+            marker = f"{counter[0]}. "
+            counter[0] += 1
+        if self._last != "\n":
+            self._write("\n")
+        indent = " " * len(marker)
+        self._write(marker + lines[0] + "".join(f"\n{indent}{line}" for line in lines[1:]) + "\n")
+
+    def _write_table(self, table: _Table) -> None:
+        rows = [row for row in table.rows if any(row)]
+        if not rows:
+            return
+        columns = max(len(row) for row in rows)
+        rows = [row + [""] * (columns - len(row)) for row in rows]
+        if not table.has_header:
+            rows.insert(0, [""] * columns)
+        lines = [f"| {' | '.join(rows[0])} |", f"|{'---|' * columns}"]
+        lines.extend(f"| {' | '.join(row)} |" for row in rows[1:])
+        self._block()
+        self._write("\n".join(lines))
+        self._block()
+
+    def markdown(self) -> str:
+        """Get the markdown of the main content, or of the whole page if it has none."""
+        everything = "".join(chunk for chunk, _ in self._chunks)
+        content = "".join(chunk for chunk, in_content in self._chunks if in_content)
+        # Prefer <main>/<article> unless it is a small part of the page, such as a teaser
+        text = content if len(content.strip()) >= len(everything.strip()) / 4 else everything
+        text = re.sub(r"[ \t]+\n", "\n", text)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def extract_content_fast(html: str, chunk_size: int = 64 * 1024) -> str:
+    """Extract and convert HTML content to Markdown format without Readability.js.
+
+    A single streaming pass drops scripts, navigation, sidebars, ads and other
+    page furniture and writes markdown for what remains. It needs no Node
+    subprocess and handles large pages in linear time, at the cost of coarser
+    boilerplate detection than Readability.
+
+    Args:
+        html: Raw HTML content to process
+        chunk_size: Number of characters fed to the tokenizer at a time
+
+    Returns:
+        Simplified markdown version of the content
+    """
+    for use_heuristics in (True, False):
+        builder = _MarkdownBuilder(use_heuristics)
+        for start in range(0, len(html), chunk_size):
+            builder.feed(html[start : start + chunk_size])
+        builder.close()
+        content = builder.markdown()
+        # Class and id heuristics can misfire on a wrapper around the whole page
+        if content:
+            return content
+    return "<error>Page failed to be simplified from HTML</error>"
@@ -1,8 +1,13 @@
-from typing import Annotated, Tuple
+import asyncio
+import codecs
+import re
+import time
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Annotated, AsyncIterator, Awaitable, Callable, Hashable, Tuple, TypeVar
 from urllib.parse import urlparse, urlunparse
 
-import markdownify
-import readabilipy.simple_json
+from httpx import AsyncClient, HTTPError, Limits, Response
 from mcp.shared.exceptions import McpError
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -20,29 +25,183 @@ from mcp.types import (
 from protego import Protego
 from pydantic import BaseModel, Field, AnyUrl
 
+from .cache import (
+    DEFAULT_PAGE_CACHE_CHARS,
+    DEFAULT_RESPONSE_CACHE_BYTES,
+    DEFAULT_ROBOTS_CACHE_SIZE,
+    DEFAULT_ROBOTS_CACHE_TTL,
+    PageCache,
+    ResponseCache,
+    RobotsCache,
+    RobotsEntry,
+)
+from .disk_cache import DEFAULT_DISK_CACHE_BYTES, DEFAULT_DISK_CACHE_TTL, DiskCache
+from .extract import (
+    DEFAULT_EXTRACTION_ENGINE,
+    DEFAULT_EXTRACTION_TIMEOUT,
+    DEFAULT_FAST_EXTRACTION_THRESHOLD,
+    ExtractionPool,
+    extract_content,
+    extract_content_from_html,
+)
+
 DEFAULT_USER_AGENT_AUTONOMOUS = "ModelContextProtocol/1.0 (Autonomous; +https://github.com/modelcontextprotocol/servers)"
 DEFAULT_USER_AGENT_MANUAL = "ModelContextProtocol/1.0 (User-Specified; +https://github.com/modelcontextprotocol/servers)"
 
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 6
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+DEFAULT_MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_CONCURRENT_FETCHES = 8
+DEFAULT_FETCH_MANY_TIMEOUT = 120.0
+MAX_BATCH_URLS = 50
+# Longest Crawl-delay honored, so that one site cannot stall the server
+MAX_CRAWL_DELAY = 30.0
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+T = TypeVar("T")
+
+CHARSET_META = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.IGNORECASE)
+
+
+def create_http_client(
+    proxy_url: str | None = None,
+    http2: bool = False,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+) -> AsyncClient:
+    """Create the HTTP client shared by all requests of a server.
 
-def extract_content_from_html(html: str) -> str:
-    """Extract and convert HTML content to Markdown format.
+    Keeping a single client alive lets repeated requests to the same site reuse
+    pooled connections, skipping DNS resolution and the TCP+TLS handshake.
 
     Args:
-        html: Raw HTML content to process
+        proxy_url: Optional proxy URL to use for requests
+        http2: Whether to negotiate HTTP/2 (requires the ``h2`` package)
+        max_connections: Maximum number of connections kept in the pool
+        keepalive_expiry: Seconds an idle connection is kept open for reuse
 
     Returns:
-        Simplified markdown version of the content
+        A configured httpx.AsyncClient, to be closed by the caller
     """
-    ret = readabilipy.simple_json.simple_json_from_html_string(
-        html, use_readability=True
-    )
-    if not ret["content"]:
-        return "<error>Page failed to be simplified from HTML</error>"
-    content = markdownify.markdownify(
-        ret["content"],
-        heading_style=markdownify.ATX,
+    return AsyncClient(
+        proxies=proxy_url,
+        http2=http2,
+        limits=Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
     )
-    return content
+
+
+def get_origin(url: str) -> str:
+    """Get the origin (scheme and network location) of a URL."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so that equivalent spellings of it compare equal.
+
+    The scheme and host are lower-cased, default ports and the fragment are
+    dropped, and an empty path becomes "/".
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    netloc = (parsed.hostname or "").lower()
+    if parsed.hostname and ":" in parsed.hostname:
+        netloc = f"[{netloc}]"
+    try:
+        port = parsed.port
+    except ValueError:
+        return url
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc += f":{port}"
+    if parsed.username is not None or parsed.password is not None:
+        netloc = parsed.netloc.rpartition("@")[0] + "@" + netloc
+    return urlunparse((scheme, netloc, parsed.path or "/", parsed.params, parsed.query, ""))
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single execution.
+
+    The first caller for a key starts the work, and callers arriving before it
+    finishes wait for the same result (or exception) instead of repeating it.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+        # A cancelled caller must not cancel the work the other callers wait for
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved in case every caller went away
+            future.exception()
+
+
+class HostLimiter:
+    """Limits the number of concurrent requests made to a single origin."""
+
+    def __init__(self, max_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST):
+        self.max_per_host = max_per_host
+        self._slots: dict[str, tuple[asyncio.Semaphore, int]] = {}
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        origin = get_origin(url)
+        semaphore, users = self._slots.get(origin, (None, 0))
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+        self._slots[origin] = (semaphore, users + 1)
+        try:
+            async with semaphore:
+                yield
+        finally:
+            semaphore, users = self._slots[origin]
+            if users <= 1:
+                del self._slots[origin]
+            else:
+                self._slots[origin] = (semaphore, users - 1)
+
+
+# Shared by the requests made without a HostLimiter, so they are limited per origin too
+DEFAULT_HOST_LIMITER = HostLimiter()
+
+
+class CrawlDelay:
+    """Spaces out requests to origins whose robots.txt sets a Crawl-delay."""
+
+    def __init__(self, max_delay: float = MAX_CRAWL_DELAY):
+        self.max_delay = max_delay
+        self._next_request: dict[str, float] = {}
+
+    async def wait(self, url: str, delay: float | None) -> None:
+        if not delay:
+            return
+        now = time.monotonic()
+        if len(self._next_request) > 1024:
+            self._next_request = {o: t for o, t in self._next_request.items() if t > now}
+        origin = get_origin(url)
+        # Reserve the next slot before sleeping so concurrent callers queue up
+        start = max(now, self._next_request.get(origin, now))
+        self._next_request[origin] = start + min(delay, self.max_delay)
+        if start > now:
+            await asyncio.sleep(start - now)
 
 
 def get_robots_txt_url(url: str) -> str:
@@ -63,88 +222,309 @@ def get_robots_txt_url(url: str) -> str:
     return robots_url
 
 
-async def check_may_autonomously_fetch_url(url: str, user_agent: str, proxy_url: str | None = None) -> None:
+async def get_robots_entry(
+    url: str,
+    user_agent: str,
+    client: AsyncClient,
+    host_limiter: HostLimiter | None = None,
+    robots_cache: RobotsCache | None = None,
+    single_flight: SingleFlight | None = None,
+) -> RobotsEntry:
     """
-    Check if the URL can be fetched by the user agent according to the robots.txt file.
-    Raises a McpError if not.
+    Get the robots.txt that applies to the URL, from the cache when it is still fresh.
+    Raises a McpError if the robots.txt cannot be fetched.
     """
-    from httpx import AsyncClient, HTTPError
+    origin = get_origin(url)
+    if robots_cache is not None:
+        entry = robots_cache.get(origin)
+        if entry is not None:
+            return entry
+    if single_flight is not None:
+        return await single_flight.do(
+            ("robots", origin, user_agent),
+            lambda: get_robots_entry(url, user_agent, client, host_limiter, robots_cache),
+        )
 
     robot_txt_url = get_robots_txt_url(url)
+    host_limiter = host_limiter or DEFAULT_HOST_LIMITER
 
-    async with AsyncClient(proxies=proxy_url) as client:
-        try:
+    try:
+        async with host_limiter.limit(robot_txt_url):
             response = await client.get(
                 robot_txt_url,
                 follow_redirects=True,
                 headers={"User-Agent": user_agent},
             )
-        except HTTPError:
-            raise McpError(ErrorData(
-                code=INTERNAL_ERROR,
-                message=f"Failed to fetch robots.txt {robot_txt_url} due to a connection issue",
-            ))
-        if response.status_code in (401, 403):
-            raise McpError(ErrorData(
-                code=INTERNAL_ERROR,
-                message=f"When fetching robots.txt ({robot_txt_url}), received status {response.status_code} so assuming that autonomous fetching is not allowed, the user can try manually fetching by using the fetch prompt",
-            ))
-        elif 400 <= response.status_code < 500:
-            return
+    except HTTPError:
+        raise McpError(ErrorData(
+            code=INTERNAL_ERROR,
+            message=f"Failed to fetch robots.txt {robot_txt_url} due to a connection issue",
+        ))
+
+    robot_txt = ""
+    robot_parser = None
+    if not 400 <= response.status_code < 500:
         robot_txt = response.text
-    processed_robot_txt = "\n".join(
-        line for line in robot_txt.splitlines() if not line.strip().startswith("#")
+        processed_robot_txt = "\n".join(
+            line for line in robot_txt.splitlines() if not line.strip().startswith("#")
+        )
+        robot_parser = Protego.parse(processed_robot_txt)
+
+    entry = RobotsEntry(robot_txt_url, response.status_code, robot_txt, robot_parser)
+    # Server errors are likely transient, so only cache definitive answers
+    if robots_cache is not None and response.status_code < 500:
+        robots_cache.put(origin, entry, response.headers)
+    return entry
+
+
+async def check_may_autonomously_fetch_url(
+    url: str,
+    user_agent: str,
+    client: AsyncClient,
+    host_limiter: HostLimiter | None = None,
+    robots_cache: RobotsCache | None = None,
+    single_flight: SingleFlight | None = None,
+) -> RobotsEntry:
+    """
+    Check if the URL can be fetched by the user agent according to the robots.txt file.
+    Raises a McpError if not, otherwise returns the robots.txt that was checked.
+    """
+    entry = await get_robots_entry(
+        url, user_agent, client, host_limiter, robots_cache, single_flight
     )
-    robot_parser = Protego.parse(processed_robot_txt)
-    if not robot_parser.can_fetch(str(url), user_agent):
+    if entry.status_code in (401, 403):
         raise McpError(ErrorData(
             code=INTERNAL_ERROR,
-            message=f"The sites robots.txt ({robot_txt_url}), specifies that autonomous fetching of this page is not allowed, "
+            message=f"When fetching robots.txt ({entry.robots_url}), received status {entry.status_code} so assuming that autonomous fetching is not allowed, the user can try manually fetching by using the fetch prompt",
+        ))
+    elif entry.parser is None:
+        return entry
+    if not entry.parser.can_fetch(str(url), user_agent):
+        raise McpError(ErrorData(
+            code=INTERNAL_ERROR,
+            message=f"The sites robots.txt ({entry.robots_url}), specifies that autonomous fetching of this page is not allowed, "
             f"<useragent>{user_agent}</useragent>\n"
             f"<url>{url}</url>"
-            f"<robots>\n{robot_txt}\n</robots>\n"
+            f"<robots>\n{entry.robots_txt}\n</robots>\n"
             f"The assistant must let the user know that it failed to view the page. The assistant may provide further guidance based on the above information.\n"
             f"The assistant can tell the user that they can try manually fetching the page by using the fetch prompt within their UI.",
         ))
+    return entry
+
+
+def sniff_content_type(head: bytes) -> str:
+    """Guess the content type of a response that does not declare a specific one.
+
+    Args:
+        head: First bytes of the response body
+
+    Returns:
+        A content type, or an empty string if it cannot be guessed
+    """
+    start = head.lstrip(b"\xef\xbb\xbf \t\r\n")[:1024].lower()
+    if start.startswith((b"<!doctype html", b"<html", b"<head", b"<body")) or b"<html" in start:
+        return "text/html"
+    if start.startswith((b"{", b"[")):
+        return "application/json"
+    if start.startswith(b"<?xml"):
+        return "application/xml"
+    if start.startswith(b"%pdf"):
+        return "application/pdf"
+    return ""
+
+
+@dataclass
+class DownloadedBody:
+    """The body of a response, read up to the configured limits."""
+
+    content: bytes
+    text: str
+    content_type: str
+    encoding: str
+    # Whether the body was cut at the byte ceiling
+    truncated: bool = False
+    # Whether reading stopped early because enough raw characters were available
+    partial: bool = False
+
+
+def is_html(text: str, content_type: str) -> bool:
+    return "<html" in text[:100] or "text/html" in content_type or not content_type
+
+
+async def read_response_body(
+    response: Response,
+    force_raw: bool = False,
+    max_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+    max_raw_chars: int | None = None,
+) -> DownloadedBody:
+    """Stream the body of a response, decoding it incrementally.
+
+    Args:
+        response: A response whose body has not been read yet
+        force_raw: Whether the content will be returned without simplification
+        max_bytes: Maximum number of body bytes to read
+        max_raw_chars: Stop reading once this many characters are available,
+            when the content is going to be returned raw
+
+    Returns:
+        The downloaded body
+    """
+    content_type = response.headers.get("content-type", "")
+    encoding = "utf-8"
+    decoder = None
+    chunks: list[bytes] = []
+    pieces: list[str] = []
+    size = 0
+    chars = 0
+    char_limit = None
+    truncated = False
+    partial = False
+
+    async for chunk in response.aiter_bytes():
+        if decoder is None:
+            if not content_type or content_type.startswith("application/octet-stream"):
+                content_type = sniff_content_type(chunk) or content_type
+            meta_charset = CHARSET_META.search(chunk[:2048])
+            encoding = response.charset_encoding or (
+                meta_charset.group(1).decode("ascii") if meta_charset else "utf-8"
+            )
+            try:
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            except LookupError:
+                encoding = "utf-8"
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        if size + len(chunk) > max_bytes:
+            chunk = chunk[: max_bytes - size]
+            truncated = True
+        chunks.append(chunk)
+        size += len(chunk)
+        pieces.append(decoder.decode(chunk))
+        chars += len(pieces[-1])
+        if len(pieces) == 1 and max_raw_chars is not None:
+            # Like is_html, decide from the start of the body, once
+            if force_raw or not is_html(pieces[0], content_type):
+                char_limit = max_raw_chars
+        if truncated:
+            break
+        if char_limit is not None and chars >= char_limit:
+            partial = True
+            break
+
+    if decoder is not None and not partial:
+        pieces.append(decoder.decode(b"", final=True))
+    return DownloadedBody(
+        content=b"".join(chunks),
+        text="".join(pieces),
+        content_type=content_type,
+        encoding=encoding,
+        truncated=truncated,
+        partial=partial,
+    )
 
 
 async def fetch_url(
-    url: str, user_agent: str, force_raw: bool = False, proxy_url: str | None = None
-) -> Tuple[str, str]:
+    url: str,
+    user_agent: str,
+    client: AsyncClient,
+    force_raw: bool = False,
+    host_limiter: HostLimiter | None = None,
+    response_cache: ResponseCache | None = None,
+    extraction_pool: ExtractionPool | None = None,
+    max_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+    max_raw_chars: int | None = None,
+    single_flight: SingleFlight | None = None,
+    before_request: Callable[[], Awaitable[None]] | None = None,
+    request_slots: asyncio.Semaphore | None = None,
+) -> Tuple[str, str, bool]:
     """
     Fetch the URL and return the content in a form ready for the LLM, as well as a prefix string with status information.
+
+    Raw content may be cut after max_raw_chars characters, in which case the
+    returned flag is true and fetching again with a higher limit returns more.
+    Concurrent fetches of the same page through one single_flight share a
+    single download and extraction. before_request is awaited only when a
+    request is actually sent, not when a fresh cached response is used. A slot
+    of request_slots is only held while downloading, after before_request and
+    the per-host limit have let the request through. Without a host_limiter,
+    requests share DEFAULT_HOST_LIMITER.
     """
-    from httpx import AsyncClient, HTTPError
+    if single_flight is not None:
+        content, prefix, partial = await single_flight.do(
+            ("fetch", normalize_url(url), user_agent, force_raw),
+            lambda: fetch_url(
+                url, user_agent, client, force_raw, host_limiter, response_cache,
+                extraction_pool, max_bytes, max_raw_chars, before_request=before_request,
+                request_slots=request_slots,
+            ),
+        )
+        # The shared fetch may have stopped reading before the end this caller needs
+        if not partial or (max_raw_chars is not None and len(content) >= max_raw_chars):
+            return content, prefix, partial
+    cached = await response_cache.get(url, user_agent) if response_cache is not None else None
+    prefix = ""
+    partial = False
+    if cached is not None and cached.is_fresh():
+        page_raw = cached.text
+        content_type = cached.headers.get("content-type", "")
+    else:
+        headers = {"User-Agent": user_agent}
+        if cached is not None:
+            headers.update(cached.validators)
+        host_limiter = host_limiter or DEFAULT_HOST_LIMITER
+        if before_request is not None:
+            await before_request()
 
-    async with AsyncClient(proxies=proxy_url) as client:
         try:
-            response = await client.get(
+            async with host_limiter.limit(url), request_slots or nullcontext(), client.stream(
+                "GET",
                 url,
                 follow_redirects=True,
-                headers={"User-Agent": user_agent},
+                headers=headers,
                 timeout=30,
-            )
+            ) as response:
+                if response.status_code >= 400:
+                    raise McpError(ErrorData(
+                        code=INTERNAL_ERROR,
+                        message=f"Failed to fetch {url} - status code {response.status_code}",
+                    ))
+                if response.status_code == 304 and cached is not None:
+                    body = None
+                else:
+                    body = await read_response_body(
+                        response, force_raw, max_bytes, max_raw_chars
+                    )
         except HTTPError as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Failed to fetch {url}: {e!r}"))
-        if response.status_code >= 400:
-            raise McpError(ErrorData(
-                code=INTERNAL_ERROR,
-                message=f"Failed to fetch {url} - status code {response.status_code}",
-            ))
 
-        page_raw = response.text
-
-    content_type = response.headers.get("content-type", "")
-    is_page_html = (
-        "<html" in page_raw[:100] or "text/html" in content_type or not content_type
-    )
+        if body is None:
+            await response_cache.revalidated(url, user_agent, response.headers)
+            page_raw = cached.text
+            content_type = cached.headers.get("content-type", "")
+        else:
+            if response_cache is not None and not body.truncated and not body.partial:
+                response_cache.put(
+                    url,
+                    user_agent,
+                    response.status_code,
+                    {**response.headers, "content-type": body.content_type},
+                    body.content,
+                    body.encoding,
+                )
+            page_raw = body.text
+            content_type = body.content_type
+            partial = body.partial
+            if body.truncated:
+                prefix = f"The response was larger than {max_bytes} bytes and has been truncated.\n"
 
-    if is_page_html and not force_raw:
-        return extract_content_from_html(page_raw), ""
+    if is_html(page_raw, content_type) and not force_raw:
+        if extraction_pool is not None:
+            return await extraction_pool.extract(page_raw), prefix, partial
+        return extract_content(page_raw), prefix, partial
 
     return (
         page_raw,
-        f"Content type {content_type} cannot be simplified to markdown, but here is the raw content:\n",
+        prefix + f"Content type {content_type} cannot be simplified to markdown, but here is the raw content:\n",
+        partial,
     )
 
 
@@ -176,12 +556,74 @@ class Fetch(BaseModel):
             description="Get the actual HTML content of the requested page, without simplification.",
         ),
     ]
+    cursor: Annotated[
+        str | None,
+        Field(
+            default=None,
+            description="Continuation token returned with truncated content. Pass it together with start_index to continue reading the same page without fetching it again.",
+        ),
+    ]
+
+
+class FetchMany(BaseModel):
+    """Parameters for fetching several URLs at once."""
+
+    urls: Annotated[
+        list[AnyUrl],
+        Field(
+            description="URLs to fetch",
+            min_length=1,
+            max_length=MAX_BATCH_URLS,
+        ),
+    ]
+    max_length: Annotated[
+        int,
+        Field(
+            default=5000,
+            description="Maximum number of characters to return for each URL.",
+            gt=0,
+            lt=1000000,
+        ),
+    ]
+    raw: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Get the actual HTML content of the requested pages, without simplification.",
+        ),
+    ]
+    ordered: Annotated[
+        bool,
+        Field(
+            default=True,
+            description="Return the results in the order of urls. When false, results are returned in the order they complete.",
+        ),
+    ]
 
 
 async def serve(
     custom_user_agent: str | None = None,
     ignore_robots_txt: bool = False,
     proxy_url: str | None = None,
+    http2: bool = False,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    robots_cache_size: int = DEFAULT_ROBOTS_CACHE_SIZE,
+    robots_cache_ttl: float = DEFAULT_ROBOTS_CACHE_TTL,
+    response_cache_bytes: int = DEFAULT_RESPONSE_CACHE_BYTES,
+    page_cache_chars: int = DEFAULT_PAGE_CACHE_CHARS,
+    extraction_workers: int | None = None,
+    extraction_timeout: float = DEFAULT_EXTRACTION_TIMEOUT,
+    max_concurrent_extractions: int | None = None,
+    extraction_engine: str = DEFAULT_EXTRACTION_ENGINE,
+    fast_extraction_threshold: int = DEFAULT_FAST_EXTRACTION_THRESHOLD,
+    max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+    max_concurrent_fetches: int = DEFAULT_MAX_CONCURRENT_FETCHES,
+    fetch_many_timeout: float = DEFAULT_FETCH_MANY_TIMEOUT,
+    cache_dir: str | None = None,
+    disk_cache_bytes: int = DEFAULT_DISK_CACHE_BYTES,
+    disk_cache_ttl: float = DEFAULT_DISK_CACHE_TTL,
 ) -> None:
     """Run the fetch MCP server.
 
@@ -189,8 +631,47 @@ async def serve(
         custom_user_agent: Optional custom User-Agent string to use for requests
         ignore_robots_txt: Whether to ignore robots.txt restrictions
         proxy_url: Optional proxy URL to use for requests
+        http2: Whether to negotiate HTTP/2 with servers that support it
+        max_connections: Maximum number of pooled connections
+        max_connections_per_host: Maximum number of concurrent requests per origin
+        keepalive_expiry: Seconds an idle pooled connection is kept open
+        robots_cache_size: Maximum number of origins whose robots.txt is cached
+        robots_cache_ttl: Seconds to cache a robots.txt that has no caching headers
+        response_cache_bytes: Memory budget of the response cache, 0 to disable it
+        page_cache_chars: Number of characters of truncated pages kept for pagination
+        extraction_workers: Number of processes converting HTML, defaults to the CPU count
+        extraction_timeout: Seconds allowed to convert a single page
+        max_concurrent_extractions: Maximum number of pages converted at once
+        extraction_engine: HTML to markdown engine, "auto", "readability" or "fast"
+        fast_extraction_threshold: Page size from which "auto" uses the fast engine
+        max_response_bytes: Maximum number of bytes read from a response body
+        max_concurrent_fetches: Maximum number of URLs fetch_many downloads at once
+        fetch_many_timeout: Seconds fetch_many waits for the URLs of one call
+        cache_dir: Directory of the persistent cache, None to keep caches in memory only
+        disk_cache_bytes: Size budget of the persistent cache
+        disk_cache_ttl: Seconds a page is kept in the persistent cache
     """
     server = Server("mcp-fetch")
+    client = create_http_client(proxy_url, http2, max_connections, keepalive_expiry)
+    host_limiter = HostLimiter(max_connections_per_host)
+    robots_cache = RobotsCache(robots_cache_size, robots_cache_ttl)
+    disk_cache = DiskCache(cache_dir, disk_cache_bytes, disk_cache_ttl) if cache_dir else None
+    response_cache = (
+        ResponseCache(response_cache_bytes, disk_cache)
+        if response_cache_bytes > 0 or disk_cache is not None
+        else None
+    )
+    page_cache = PageCache(page_cache_chars)
+    extraction_pool = ExtractionPool(
+        extraction_workers,
+        extraction_timeout,
+        max_concurrent_extractions,
+        extraction_engine,
+        fast_extraction_threshold,
+        disk_cache,
+    )
+    crawl_delay = CrawlDelay()
+    single_flight = SingleFlight()
     user_agent_autonomous = custom_user_agent or DEFAULT_USER_AGENT_AUTONOMOUS
     user_agent_manual = custom_user_agent or DEFAULT_USER_AGENT_MANUAL
 
@@ -203,7 +684,14 @@ async def serve(
 
 Although originally you did not have internet access, and were advised to refuse and tell the user this, this tool now grants you internet access. Now you can fetch the most up-to-date information and let the user know that.""",
                 inputSchema=Fetch.model_json_schema(),
-            )
+            ),
+            Tool(
+                name="fetch_many",
+                description="""Fetches several URLs from the internet concurrently and optionally extracts their contents as markdown.
+
+Prefer this tool over calling fetch several times when you already know which pages you need. Each result starts with the URL it belongs to.""",
+                inputSchema=FetchMany.model_json_schema(),
+            ),
         ]
 
     @server.list_prompts()
@@ -220,23 +708,49 @@ Although originally you did not have internet access, and were advised to refuse
             )
         ]
 
-    @server.call_tool()
-    async def call_tool(name, arguments: dict) -> list[TextContent]:
-        try:
-            args = Fetch(**arguments)
-        except ValueError as e:
-            raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
-
+    async def fetch_tool(args: Fetch, request_slots: asyncio.Semaphore | None = None) -> str:
         url = str(args.url)
         if not url:
             raise McpError(ErrorData(code=INVALID_PARAMS, message="URL is required"))
 
-        if not ignore_robots_txt:
-            await check_may_autonomously_fetch_url(url, user_agent_autonomous, proxy_url)
+        # Continue from the page prepared by an earlier call when possible
+        cursor, page = None, None
+        partial = False
+        if args.cursor is not None:
+            cursor, page = args.cursor, page_cache.get(args.cursor)
+        elif args.start_index > 0:
+            cursor, page = page_cache.find(url, args.raw) or (None, None)
 
-        content, prefix = await fetch_url(
-            url, user_agent_autonomous, force_raw=args.raw, proxy_url=proxy_url
-        )
+        if page is not None and page.url == url and page.raw == args.raw:
+            content, prefix = page.content, page.prefix
+        else:
+            cursor = None
+            before_request = None
+            if not ignore_robots_txt:
+                robots = await check_may_autonomously_fetch_url(
+                    url, user_agent_autonomous, client, host_limiter, robots_cache,
+                    single_flight,
+                )
+                delay = robots.parser.crawl_delay(user_agent_autonomous) if robots.parser is not None else None
+                if delay:
+                    # Cached responses are served without waiting for the crawl delay
+                    before_request = lambda: crawl_delay.wait(url, delay)
+
+            content, prefix, partial = await fetch_url(
+                url,
+                user_agent_autonomous,
+                client,
+                force_raw=args.raw,
+                host_limiter=host_limiter,
+                response_cache=response_cache,
+                extraction_pool=extraction_pool,
+                max_bytes=max_response_bytes,
+                # One extra character tells whether more content follows the window
+                max_raw_chars=args.start_index + args.max_length + 1,
+                single_flight=single_flight,
+                before_request=before_request,
+                request_slots=request_slots,
+            )
         original_length = len(content)
         if args.start_index >= original_length:
             content = "<error>No more content available.</error>"
@@ -245,14 +759,68 @@ Although originally you did not have internet access, and were advised to refuse
             if not truncated_content:
                 content = "<error>No more content available.</error>"
             else:
-                content = truncated_content
                 actual_content_length = len(truncated_content)
                 remaining_content = original_length - (args.start_index + actual_content_length)
                 # Only add the prompt to continue fetching if there is still remaining content
                 if actual_content_length == args.max_length and remaining_content > 0:
                     next_start = args.start_index + actual_content_length
-                    content += f"\n\n<error>Content truncated. Call the fetch tool with a start_index of {next_start} to get more content.</error>"
-        return [TextContent(type="text", text=f"{prefix}Contents of {url}:\n{content}")]
+                    # Content cut short while downloading must be fetched again to go further
+                    if partial:
+                        truncated_content += f"\n\n<error>Content truncated. Call the fetch tool with a start_index of {next_start} to get more content.</error>"
+                    else:
+                        if cursor is None:
+                            cursor = page_cache.put(url, args.raw, content, prefix)
+                        truncated_content += f"\n\n<error>Content truncated. Call the fetch tool with a start_index of {next_start} and a cursor of \"{cursor}\" to get more content.</error>"
+                content = truncated_content
+        return f"{prefix}Contents of {url}:\n{content}"
+
+    fetch_slots = asyncio.Semaphore(max_concurrent_fetches)
+
+    async def fetch_many_tool(args: FetchMany) -> list[str]:
+        async def fetch_one(url: AnyUrl) -> str:
+            # Waiting for a crawl delay or a busy host does not hold one of the
+            # fetch slots, so it does not hold up the URLs of other hosts
+            try:
+                return await fetch_tool(
+                    Fetch(url=url, max_length=args.max_length, raw=args.raw), fetch_slots
+                )
+            except McpError as e:
+                return f"Failed to fetch {url}:\n<error>{e.error.message}</error>"
+
+        tasks = [asyncio.ensure_future(fetch_one(url)) for url in args.urls]
+        completed: list[asyncio.Task] = []
+        for task in tasks:
+            task.add_done_callback(completed.append)
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=fetch_many_timeout)
+        finally:
+            for task in tasks:
+                task.cancel()
+        timed_out = {
+            task: f"Failed to fetch {url}:\n<error>The page was not fetched within the "
+            f"{fetch_many_timeout:g} second limit of the batch</error>"
+            for url, task in zip(args.urls, tasks)
+            if task in pending
+        }
+        if args.ordered:
+            return [timed_out.get(task) or task.result() for task in tasks]
+        return [task.result() for task in completed if task not in timed_out] + list(timed_out.values())
+
+    @server.call_tool()
+    async def call_tool(name, arguments: dict) -> list[TextContent]:
+        if name == "fetch_many":
+            try:
+                many_args = FetchMany(**arguments)
+            except ValueError as e:
+                raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+            results = await fetch_many_tool(many_args)
+            return [TextContent(type="text", text=result) for result in results]
+
+        try:
+            args = Fetch(**arguments)
+        except ValueError as e:
+            raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+        return [TextContent(type="text", text=await fetch_tool(args))]
 
     @server.get_prompt()
     async def get_prompt(name: str, arguments: dict | None) -> GetPromptResult:
@@ -262,7 +830,16 @@ Although originally you did not have internet access, and were advised to refuse
         url = arguments["url"]
 
         try:
-            content, prefix = await fetch_url(url, user_agent_manual, proxy_url=proxy_url)
+            content, prefix, _ = await fetch_url(
+                url,
+                user_agent_manual,
+                client,
+                host_limiter=host_limiter,
+                response_cache=response_cache,
+                extraction_pool=extraction_pool,
+                max_bytes=max_response_bytes,
+                single_flight=single_flight,
+            )
             # TODO: after SDK bug is addressed, don't catch the exception
         except McpError as e:
             return GetPromptResult(
@@ -284,5 +861,10 @@ Although originally you did not have internet access, and were advised to refuse
         )
 
     options = server.create_initialization_options()
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, options, raise_exceptions=True)
+    try:
+        async with client, stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, options, raise_exceptions=True)
+    finally:
+        extraction_pool.close()
+        if disk_cache is not None:
+            disk_cache.close()
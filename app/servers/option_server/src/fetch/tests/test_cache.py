@@ -0,0 +1,114 @@
+import asyncio
+
+import httpx
+
+from mcp_server_fetch.cache import ResponseCache, RobotsCache
+from mcp_server_fetch.server import check_may_autonomously_fetch_url, fetch_url
+
+URL = "https://example.com/page"
+USER_AGENT = "test-agent"
+
+
+def make_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def fetch(client, cache, **kwargs):
+    return fetch_url(URL, USER_AGENT, client, response_cache=cache, **kwargs)
+
+
+def test_fresh_response_is_served_from_cache():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(
+            200, headers={"content-type": "text/plain", "cache-control": "max-age=60"}, text="hello"
+        )
+
+    async def run():
+        cache = ResponseCache()
+        async with make_client(handler) as client:
+            first = await fetch(client, cache)
+            second = await fetch(client, cache)
+        return cache, first, second
+
+    cache, first, second = asyncio.run(run())
+    assert len(requests) == 1
+    assert first == second
+    assert first[0] == "hello"
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_stale_response_is_revalidated_with_304():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"', "cache-control": "max-age=0"})
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/plain", "etag": '"v1"', "cache-control": "max-age=0"},
+            text="hello",
+        )
+
+    async def run():
+        cache = ResponseCache()
+        async with make_client(handler) as client:
+            first = await fetch(client, cache)
+            second = await fetch(client, cache)
+        return cache, first, second
+
+    cache, first, second = asyncio.run(run())
+    assert [r.headers.get("if-none-match") for r in requests] == [None, '"v1"']
+    assert second == first
+    assert cache.revalidations == 1
+    # The 304 only refreshed the headers, not the stored content
+    assert asyncio.run(cache.get(URL, USER_AGENT)).headers["content-type"] == "text/plain"
+
+
+def test_least_recently_used_response_is_evicted():
+    cache = ResponseCache(max_bytes=8000)
+    headers = {"cache-control": "max-age=60"}
+    for i in range(8):
+        cache.put(f"{URL}/{i}", USER_AGENT, 200, headers, b"x" * 900, "utf-8")
+    assert len(cache) == 8
+
+    # Reading an entry makes it the most recently used one
+    assert asyncio.run(cache.get(f"{URL}/0", USER_AGENT)) is not None
+    cache.put(f"{URL}/8", USER_AGENT, 200, headers, b"x" * 900, "utf-8")
+
+    assert cache.current_bytes <= cache.max_bytes
+    assert cache.evictions == 1
+    assert asyncio.run(cache.get(f"{URL}/1", USER_AGENT)) is None
+    assert asyncio.run(cache.get(f"{URL}/0", USER_AGENT)) is not None
+
+
+def test_robots_txt_is_fetched_once_per_origin_until_it_expires():
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        return httpx.Response(200, text="User-agent: *\nDisallow: /private\n")
+
+    async def check(client, cache, url):
+        await check_may_autonomously_fetch_url(url, USER_AGENT, client, robots_cache=cache)
+
+    async def run():
+        # No caching headers, so the robots.txt is kept for the default TTL
+        cache = RobotsCache(default_ttl=0.5)
+        async with make_client(handler) as client:
+            for path in ("a", "b", "c"):
+                await check(client, cache, f"https://example.com/{path}")
+                await check(client, cache, f"https://other.example/{path}")
+            assert len(requests) == 2
+            await asyncio.sleep(0.6)
+            await check(client, cache, "https://example.com/d")
+
+    asyncio.run(run())
+    assert requests == [
+        "https://example.com/robots.txt",
+        "https://other.example/robots.txt",
+        "https://example.com/robots.txt",
+    ]
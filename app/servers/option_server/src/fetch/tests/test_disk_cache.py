@@ -0,0 +1,84 @@
+import asyncio
+import os
+import sqlite3
+import time
+
+import pytest
+
+from mcp_server_fetch.disk_cache import DiskCache
+
+
+@pytest.fixture
+def disk(tmp_path):
+    cache = DiskCache(tmp_path)
+    yield cache
+    cache.close()
+
+
+def stored_bytes(cache: DiskCache) -> int:
+    with sqlite3.connect(cache.path) as db:
+        return db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+
+def test_value_and_metadata_round_trip(disk, tmp_path):
+    disk.put("page", b"hello" * 100, {"status": 200})
+    disk.flush()
+
+    assert disk.get("page") == (b"hello" * 100, {"status": 200})
+    assert asyncio.run(disk.aget("page")) == (b"hello" * 100, {"status": 200})
+    assert disk.get("missing") is None
+
+    disk.update_metadata("page", {"etag": '"v1"'})
+    disk.flush()
+    assert disk.get("page")[1] == {"status": 200, "etag": '"v1"'}
+
+    # Another server process sharing the directory finds the entry too
+    other = DiskCache(tmp_path)
+    try:
+        assert other.get("page") == (b"hello" * 100, {"status": 200, "etag": '"v1"'})
+    finally:
+        other.close()
+
+
+def test_expired_entries_are_not_returned(disk):
+    disk.put("short", b"gone soon", ttl=0.1)
+    disk.put("long", b"still here")
+    disk.flush()
+    assert disk.get("short") is not None
+
+    time.sleep(0.2)
+    assert disk.get("short") is None
+    # The next write drops it from the database
+    disk.put("other", b"x")
+    disk.flush()
+    assert disk.stats["entries"] == 2
+    assert disk.get("long") == (b"still here", {})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # Random bytes do not compress, so each entry takes a little over 1000 bytes
+    disk = DiskCache(tmp_path, max_bytes=16_000)
+    try:
+        for i in range(20):
+            disk.put(f"page/{i}", os.urandom(1000))
+        disk.put("page/19", os.urandom(1500))
+        disk.flush()
+
+        assert disk.get("page/0") is None
+        assert disk.get("page/19") is not None
+        assert disk.stats["bytes"] <= disk.max_bytes
+        # The running total matches the stored entries after replacements and evictions
+        assert disk.stats["bytes"] == stored_bytes(disk)
+    finally:
+        disk.close()
+
+
+def test_entries_larger_than_an_eighth_of_the_cache_are_not_stored(tmp_path):
+    disk = DiskCache(tmp_path, max_bytes=16_000)
+    try:
+        disk.put("large", os.urandom(3000))
+        disk.flush()
+        assert disk.get("large") is None
+        assert disk.stats == {"entries": 0, "bytes": 0}
+    finally:
+        disk.close()
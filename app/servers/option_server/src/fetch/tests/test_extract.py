@@ -0,0 +1,83 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from mcp.shared.exceptions import McpError
+
+from mcp_server_fetch import extract
+from mcp_server_fetch.extract import ExtractionPool
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="reads process states from /proc")
+
+
+def stuck_extract(html: str, engine: str, fast_threshold: int) -> str:
+    """Stands in for extract_content: starts a child process, like Readability.js, and hangs."""
+    child = subprocess.Popen(["sleep", "60"])
+    Path(html).write_text(f"{os.getpid()} {child.pid}")
+    time.sleep(60)
+    return "never returned"
+
+
+def is_running(pid: int) -> bool:
+    try:
+        state = Path(f"/proc/{pid}/stat").read_text().rpartition(") ")[2][0]
+    except (FileNotFoundError, ProcessLookupError):
+        # The process was reaped, possibly while reading its state
+        return False
+    # A killed process is a zombie until its parent reaps it
+    return state != "Z"
+
+
+def wait_until_stopped(pids: list[int], timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while any(is_running(pid) for pid in pids):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def started_pids(path: Path) -> list[int]:
+    return [int(pid) for pid in path.read_text().split()]
+
+
+def test_timed_out_worker_is_killed_with_its_children(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract, "extract_content", stuck_extract)
+    marker = tmp_path / "pids"
+    pool = ExtractionPool(max_workers=1, timeout=3.0)
+
+    async def run():
+        with pytest.raises(McpError, match="longer than 3 seconds"):
+            await pool.extract(str(marker))
+
+    try:
+        asyncio.run(run())
+        assert wait_until_stopped(started_pids(marker))
+        # Later documents go to a fresh pool
+        assert pool._executor is None
+    finally:
+        pool.close()
+
+
+def test_close_does_not_wait_for_a_stuck_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract, "extract_content", stuck_extract)
+    marker = tmp_path / "pids"
+    pool = ExtractionPool(max_workers=1, timeout=60.0)
+
+    async def run():
+        task = asyncio.ensure_future(pool.extract(str(marker)))
+        while not marker.exists() or not marker.read_text():
+            await asyncio.sleep(0.05)
+        start = time.monotonic()
+        pool.close()
+        elapsed = time.monotonic() - start
+        with pytest.raises(McpError, match="crashed"):
+            await task
+        return elapsed
+
+    assert asyncio.run(run()) < 1.0
+    assert wait_until_stopped(started_pids(marker))
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+
+from mcp_server_fetch.fast_extract import extract_content_fast
+
+CORPUS = Path(__file__).parent.parent / "benchmarks" / "corpus"
+
+
+@pytest.fixture
+def news_story() -> str:
+    return (CORPUS / "news-story.html").read_text()
+
+
+@pytest.fixture
+def blog_article() -> str:
+    return (CORPUS / "blog-article.html").read_text()
+
+
+def test_boilerplate_is_removed(news_story):
+    content = extract_content_fast(news_story)
+
+    assert content.startswith("# Council approves harbor water main replacement\n")
+    assert "## Paying for the project" in content
+    for furniture in (
+        "Subscribe for $1 a week",  # banner
+        "This site uses cookies",  # consent popup
+        "Advertisement",  # ad containers
+        "Get the morning briefing",  # newsletter box
+        "Story headline number 0",  # related stories
+        "Ferry schedule changes announced",  # <aside>
+    ):
+        assert furniture not in content
+
+
+def test_links_images_and_emphasis_are_kept(blog_article):
+    content = extract_content_fast(blog_article)
+
+    assert content.startswith("# Understanding Connection Pooling\n")
+    assert "**hundreds of requests**" in content
+    assert "A *connection pool* keeps" in content
+    assert "![Timeline of a TCP and TLS handshake](/images/handshake-timeline.png)" in content
+
+
+def test_output_does_not_depend_on_chunk_size(news_story):
+    assert extract_content_fast(news_story, chunk_size=7) == extract_content_fast(news_story)
+
+
+def test_lists():
+    html = (
+        "<html><body><nav>Home About</nav><article><h1>Title</h1>"
+        "<ul><li>one</li><li>two<ul><li>inner</li></ul></li></ul>"
+        "<ol><li>first<li>second</ol>"
+        "</article><footer>Copyright</footer></body></html>"
+    )
+
+    assert extract_content_fast(html) == "# Title\n\n- one\n- two\n  - inner\n\n1. first\n2. second"
+
+
+def test_tables():
+    html = (
+        "<table><thead><tr><th>Name</th><th>Size</th></tr></thead>"
+        "<tbody><tr><td>a</td><td>1</td></tr><tr><td>b<td>2</tbody></table>"
+    )
+    assert extract_content_fast(html) == "| Name | Size |\n|---|---|\n| a | 1 |\n| b | 2 |"
+
+    # Tables without a header row get an empty one, as markdown requires it
+    html = "<table><tr><td>x</td><td>y</td></tr></table>"
+    assert extract_content_fast(html) == "|  |  |\n|---|---|\n| x | y |"
+
+
+def test_falls_back_to_extraction_without_heuristics():
+    # The class of the wrapper marks it as boilerplate, which would leave nothing
+    html = '<html><body><div class="sidebar"><p>All of the content</p></div></body></html>'
+
+    assert extract_content_fast(html) == "All of the content"
+
+
+def test_page_without_content():
+    html = "<html><head><title>Empty</title></head><body><script>run()</script></body></html>"
+
+    assert extract_content_fast(html) == "<error>Page failed to be simplified from HTML</error>"
@@ -0,0 +1,270 @@
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from mcp import ClientSession
+from mcp.shared.memory import create_client_server_memory_streams
+
+from mcp_server_fetch import server
+from mcp_server_fetch.extract import extract_content
+from mcp_server_fetch.server import (
+    DEFAULT_MAX_CONNECTIONS_PER_HOST,
+    CrawlDelay,
+    HostLimiter,
+    SingleFlight,
+    fetch_url,
+)
+
+URL = "https://example.com/page"
+USER_AGENT = "test-agent"
+
+
+def make_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def text_response(request) -> httpx.Response:
+    return httpx.Response(200, headers={"content-type": "text/plain"}, text=request.url.host)
+
+
+def streamed_response(sent: list[int], chunks: int, content_type: str = "text/plain"):
+    """Respond with chunks of 1000 bytes, counting how many the client pulled."""
+
+    async def stream():
+        for i in range(chunks):
+            sent.append(i)
+            yield b"x" * 1000
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": content_type}, content=stream())
+
+    return handler
+
+
+class ConcurrencyTracker:
+    """Answers requests slowly, recording how many were in flight per host."""
+
+    def __init__(self):
+        self.active: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+
+    async def __call__(self, request) -> httpx.Response:
+        host = request.url.host
+        self.active[host] = self.active.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        await asyncio.sleep(0.05)
+        self.active[host] -= 1
+        return text_response(request)
+
+
+def run_server(monkeypatch, handler, body, **options):
+    """Run serve() over in-memory streams, with requests answered by handler."""
+
+    async def run():
+        async with create_client_server_memory_streams() as (client_streams, server_streams):
+            @asynccontextmanager
+            async def memory_stdio():
+                yield server_streams
+
+            monkeypatch.setattr(server, "stdio_server", memory_stdio)
+            monkeypatch.setattr(server, "create_http_client", lambda *args: make_client(handler))
+            task = asyncio.ensure_future(server.serve(**options))
+            try:
+                async with ClientSession(*client_streams) as session:
+                    await session.initialize()
+                    return await body(session)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    return asyncio.run(run())
+
+
+async def call_fetch(session, **arguments) -> str:
+    result = await session.call_tool("fetch", arguments)
+    assert not result.isError, result.content[0].text
+    return result.content[0].text
+
+
+def test_crawl_delay_does_not_hold_a_request_slot():
+    finished = {}
+
+    async def run():
+        slots = asyncio.Semaphore(1)
+        crawl_delay = CrawlDelay()
+        start = time.monotonic()
+
+        async def fetch(url, delay):
+            async with make_client(text_response) as client:
+                await fetch_url(
+                    url, USER_AGENT, client,
+                    before_request=lambda: crawl_delay.wait(url, delay),
+                    request_slots=slots,
+                )
+            finished[url] = time.monotonic() - start
+
+        await fetch("https://slow.example/a", 0.5)
+        # The second request to the slow host waits for its crawl delay...
+        await asyncio.gather(
+            fetch("https://slow.example/b", 0.5),
+            fetch("https://fast.example/a", None),
+        )
+
+    asyncio.run(run())
+    # ...while the only slot serves the other host
+    assert finished["https://fast.example/a"] < 0.25
+    assert finished["https://slow.example/b"] >= 0.45
+
+
+def test_body_is_cut_at_the_byte_ceiling():
+    sent = []
+
+    async def run():
+        async with make_client(streamed_response(sent, 100)) as client:
+            return await fetch_url(URL, USER_AGENT, client, max_bytes=20_000)
+
+    content, prefix, partial = asyncio.run(run())
+    assert len(content) == 20_000
+    assert prefix.startswith("The response was larger than 20000 bytes and has been truncated.\n")
+    assert not partial
+    # Reading stopped at the ceiling instead of downloading the whole body
+    assert len(sent) <= 21
+
+
+def test_raw_content_stops_reading_once_enough_is_available():
+    sent = []
+
+    async def run():
+        async with make_client(streamed_response(sent, 100, "text/html")) as client:
+            return await fetch_url(URL, USER_AGENT, client, force_raw=True, max_raw_chars=2500)
+
+    content, _, partial = asyncio.run(run())
+    assert partial
+    assert len(content) == 3000
+    assert len(sent) == 3
+
+
+def test_single_flight_coalesces_concurrent_fetches():
+    requests = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def handler(request):
+            requests.append(request)
+            # Hold the response until every caller has asked for the page
+            await release.wait()
+            return httpx.Response(200, headers={"content-type": "text/plain"}, text="hello")
+
+        single_flight = SingleFlight()
+        async with make_client(handler) as client:
+            tasks = [
+                asyncio.ensure_future(fetch_url(URL, USER_AGENT, client, single_flight=single_flight))
+                for _ in range(5)
+            ]
+            await asyncio.sleep(0.05)
+            release.set()
+            results = await asyncio.gather(*tasks)
+        return single_flight, results
+
+    single_flight, results = asyncio.run(run())
+    assert len(requests) == 1
+    assert all(result == results[0] for result in results)
+    assert len(single_flight) == 0
+
+
+def test_single_flight_shares_errors():
+    async def run():
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        single_flight = SingleFlight()
+        return await asyncio.gather(
+            single_flight.do("key", fail), single_flight.do("key", fail), return_exceptions=True
+        )
+
+    first, second = asyncio.run(run())
+    assert isinstance(first, ValueError)
+    # Both callers waited for the same failed call
+    assert first is second
+
+
+def test_host_limiter_limits_requests_per_origin():
+    tracker = ConcurrencyTracker()
+
+    async def run():
+        host_limiter = HostLimiter(2)
+        async with make_client(tracker) as client:
+            await asyncio.gather(*(
+                fetch_url(f"https://{host}/{i}", USER_AGENT, client, host_limiter=host_limiter)
+                for host in ("a.example", "b.example")
+                for i in range(6)
+            ))
+
+    asyncio.run(run())
+    assert tracker.peak == {"a.example": 2, "b.example": 2}
+
+
+def test_requests_without_a_host_limiter_share_the_default_one():
+    tracker = ConcurrencyTracker()
+
+    async def run():
+        async with make_client(tracker) as client:
+            await asyncio.gather(*(
+                fetch_url(f"https://a.example/{i}", USER_AGENT, client)
+                for i in range(DEFAULT_MAX_CONNECTIONS_PER_HOST * 2)
+            ))
+
+    asyncio.run(run())
+    assert tracker.peak == {"a.example": DEFAULT_MAX_CONNECTIONS_PER_HOST}
+
+
+def test_tool_calls_share_the_client_and_host_limiter(monkeypatch):
+    tracker = ConcurrencyTracker()
+
+    async def body(session):
+        urls = [f"https://a.example/{i}" for i in range(6)]
+        return await asyncio.gather(
+            session.call_tool("fetch_many", {"urls": urls[:3]}),
+            session.call_tool("fetch_many", {"urls": urls[3:]}),
+        )
+
+    results = run_server(
+        monkeypatch, tracker, body, ignore_robots_txt=True, max_connections_per_host=2,
+    )
+    assert all(not result.isError for result in results)
+    # Concurrent calls share the limit of the server
+    assert tracker.peak == {"a.example": 2}
+
+
+def test_cursor_continues_a_cached_page_without_fetching_it_again(monkeypatch):
+    paragraphs = "".join(f"<p>Paragraph {i} of the article.</p>" for i in range(200))
+    html = f"<html><body><article><h1>Title</h1>{paragraphs}</article></body></html>"
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=html)
+
+    async def body(session):
+        first = await call_fetch(session, url=URL, max_length=1000)
+        cursor = re.search(r'start_index of (\d+) and a cursor of "(\w+)"', first)
+        second = await call_fetch(
+            session, url=URL, max_length=1000,
+            start_index=int(cursor.group(1)), cursor=cursor.group(2),
+        )
+        return first, second
+
+    first, second = run_server(
+        monkeypatch, handler, body,
+        ignore_robots_txt=True, response_cache_bytes=0, extraction_engine="fast",
+        extraction_workers=1,
+    )
+    assert len(requests) == 1
+    # The second window starts where the first one was cut
+    content = extract_content(html, "fast")
+    assert first.startswith(f"Contents of {URL}:\n{content[:1000]}\n\n<error>")
+    assert second.startswith(f"Contents of {URL}:\n{content[1000:2000]}\n\n<error>")
@@ -2,12 +2,39 @@ import click
 from pathlib import Path
 import logging
 import sys
+from .scheduler import DEFAULT_MAX_WORKERS
 from .server import serve
+from .watcher import DEFAULT_POLL_INTERVAL
 
 @click.command()
 @click.option("--repository", "-r", type=Path, help="Git repository path")
+@click.option(
+    "--max-workers",
+    type=int,
+    default=DEFAULT_MAX_WORKERS,
+    show_default=True,
+    help="Number of threads running git operations",
+)
+@click.option(
+    "--track-changes",
+    is_flag=True,
+    help="Watch working trees for changes to speed up porcelain git_status (requires mcp-server-git[watch])",
+)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=DEFAULT_POLL_INTERVAL,
+    show_default=True,
+    help="Seconds between checks of opened repositories for new commits when watchdog is not installed",
+)
 @click.option("-v", "--verbose", count=True)
-def main(repository: Path | None, verbose: bool) -> None:
+def main(
+    repository: Path | None,
+    max_workers: int,
+    track_changes: bool,
+    poll_interval: float,
+    verbose: bool,
+) -> None:
     """MCP Git Server - Git functionality for MCP"""
     import asyncio
 
@@ -18,7 +45,7 @@ def main(repository: Path | None, verbose: bool) -> None:
         logging_level = logging.DEBUG
 
     logging.basicConfig(level=logging_level, stream=sys.stderr)
-    asyncio.run(serve(repository))
+    asyncio.run(serve(repository, max_workers, track_changes, poll_interval))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,109 @@
+"""Object reads through the long-running ``git cat-file`` processes of a Repo.
+
+GitPython keeps one ``git cat-file --batch`` and one ``--batch-check`` process
+alive per Repo and reads objects through their pipes. Together with the
+RepoCache this lets history and commit metadata reads skip the fork and exec
+of a new git process (``rev-list``) on every tool call. Diffs are still
+produced by ``git diff`` processes, see the diff module.
+"""
+
+import heapq
+import io
+import os
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import git
+
+
+class SharedGit(git.Git):
+    """A git.Git whose cat-file processes can be used from several threads.
+
+    GitPython reads objects through a single pair of pipes, so only one
+    object is read at a time. An object is read in full before the pipe is
+    handed to the next thread.
+    """
+
+    __slots__ = ("_cat_file_lock",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cat_file_lock = threading.RLock()
+
+    def get_object_header(self, ref):
+        with self._cat_file_lock:
+            return super().get_object_header(ref)
+
+    def get_object_data(self, ref):
+        with self._cat_file_lock:
+            return super().get_object_data(ref)
+
+    def stream_object_data(self, ref):
+        with self._cat_file_lock:
+            hexsha, typename, size, stream = super().stream_object_data(ref)
+            data = stream.read(size)
+            del stream
+        return hexsha, typename, size, io.BytesIO(data)
+
+    def clear_cache(self):
+        with self._cat_file_lock:
+            return super().clear_cache()
+
+
+class SharedRepo(git.Repo):
+    """A Repo that may be shared by the threads of the server."""
+
+    GitCommandWrapperType = SharedGit
+
+
+def common_git_dir(git_dir: str) -> str:
+    """The git directory holding the shared refs, which differs for a linked worktree."""
+    try:
+        return os.path.join(git_dir, Path(git_dir, "commondir").read_text().strip())
+    except OSError:
+        return git_dir
+
+
+def read_head_state(git_dir: str) -> tuple | None:
+    """Fingerprint of where HEAD points, or None if the repository is gone."""
+    try:
+        head = Path(git_dir, "HEAD").read_text().strip()
+    except OSError:
+        return None
+    state = [head]
+    if head.startswith("ref:"):
+        # A commit moves the branch ref, which is a loose file or lives in packed-refs
+        common_dir = common_git_dir(git_dir)
+        for path in (
+            os.path.join(git_dir, head[4:].strip()),
+            os.path.join(common_dir, head[4:].strip()),
+            os.path.join(common_dir, "packed-refs"),
+        ):
+            try:
+                info = os.stat(path)
+                state.append((info.st_mtime_ns, info.st_size))
+            except OSError:
+                state.append(None)
+    return tuple(state)
+
+
+def iter_commits(repo: git.Repo, rev: str = "HEAD") -> Iterator[git.Commit]:
+    """Walk the history of rev newest first, in the default order of git log.
+
+    Commits are read through cat-file, so no rev-list process is started.
+    """
+    start = repo.commit(rev)
+    seen = {start.binsha}
+    # The counter keeps commits with equal dates in the order they were reached
+    queue = [(-start.committed_date, 0, start)]
+    counter = 1
+    while queue:
+        _, _, commit = heapq.heappop(queue)
+        yield commit
+        for parent in commit.parents:
+            if parent.binsha not in seen:
+                seen.add(parent.binsha)
+                heapq.heappush(queue, (-parent.committed_date, counter, parent))
+                counter += 1
+
@@ -0,0 +1,190 @@
+"""Diff rendering with output modes, size budgets and per-file pagination."""
+
+from dataclasses import dataclass
+from typing import Literal
+
+import git
+
+DiffMode = Literal["patch", "stat", "name-only"]
+
+DEFAULT_MAX_FILE_BYTES = 64 * 1024
+DEFAULT_MAX_TOTAL_BYTES = 512 * 1024
+DEFAULT_MAX_FILES = 200
+STAT_GRAPH_WIDTH = 40
+
+
+@dataclass(frozen=True)
+class DiffOptions:
+    mode: DiffMode = "patch"
+    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES
+    max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES
+    file_offset: int = 0
+    max_files: int = DEFAULT_MAX_FILES
+
+
+def _size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _truncate(text: str, limit: int) -> str:
+    data = text.encode("utf-8")
+    if len(data) <= limit:
+        return text
+    kept = data[:limit].decode("utf-8", errors="ignore")
+    kept = kept[: kept.rfind("\n") + 1] or kept
+    return kept + f"[... {len(data) - _size(kept)} more bytes of this file's diff not shown]\n"
+
+
+def _stat_line(path: str, added: int | None, removed: int | None) -> str:
+    if added is None or removed is None:
+        return f" {path} | Bin\n"
+    changed = added + removed
+    scale = min(1.0, STAT_GRAPH_WIDTH / changed) if changed else 1.0
+    graph = "+" * (added and max(1, round(added * scale))) + "-" * (
+        removed and max(1, round(removed * scale))
+    )
+    return f" {path} | {changed} {graph}\n"
+
+
+def _stat_summary(files: int, added: int, removed: int) -> str:
+    return f" {files} files changed, {added} insertions(+), {removed} deletions(-)\n"
+
+
+def _page_footer(options: DiffOptions, shown: int, total: int) -> str:
+    next_offset = options.file_offset + shown
+    if next_offset >= total:
+        return ""
+    return (
+        f"\n[Showing files {options.file_offset + 1}-{next_offset} of {total}. "
+        f"Call again with file_offset {next_offset} to see more.]\n"
+    )
+
+
+def _paginate(entries: list[str], options: DiffOptions, total: int) -> str:
+    """Join rendered file entries until the total budget is spent."""
+    output = []
+    used = 0
+    for entry in entries:
+        if output and used + _size(entry) > options.max_total_bytes:
+            break
+        output.append(_truncate(entry, options.max_total_bytes))
+        used += _size(output[-1])
+    return "".join(output) + _page_footer(options, len(output), total)
+
+
+def _literal_paths(paths: list[str]) -> list[str]:
+    return [f":(literal){path}" for path in paths]
+
+
+def _list_files(repo: git.Repo, args: list[str]) -> list[tuple[str, list[str]]]:
+    """List (status, paths) of the files changed by a git diff invocation.
+
+    A rename or copy has the source path before the destination path.
+    """
+    output = repo.git.diff(*args, "--name-status", "-M", "-z", strip_newline_in_stdout=False)
+    fields = iter(output.split("\0"))
+    files = []
+    for status in fields:
+        if not status:
+            continue
+        files.append((status, [next(fields) for _ in range(2 if status[0] in "RC" else 1)]))
+    return files
+
+
+def _numstat(repo: git.Repo, args: list[str], paths: list[str]) -> list[tuple[int | None, int | None, str]]:
+    output = repo.git.diff(
+        *args, "--numstat", "-M", "-z", "--", *_literal_paths(paths),
+        strip_newline_in_stdout=False,
+    )
+    stats = []
+    records = iter(output.split("\0"))
+    for record in records:
+        if not record:
+            continue
+        added, removed, path = record.split("\t", 2)
+        if not path:
+            # A rename lists its source and destination in the next two fields
+            path = f"{next(records)} => {next(records)}"
+        if added == "-":
+            stats.append((None, None, path))
+        else:
+            stats.append((int(added), int(removed), path))
+    return stats
+
+
+def _stream_patches(repo: git.Repo, args: list[str], paths: list[str], options: DiffOptions) -> list[str]:
+    """Read the patches of paths one file at a time, stopping once the budget is spent."""
+    process = repo.git.diff(
+        *args, "-M", "--no-color", "--", *_literal_paths(paths), as_process=True
+    )
+    entries: list[str] = []
+    current: list[str] = []
+    current_bytes = 0
+    dropped = 0
+    used = 0
+
+    def finish() -> None:
+        nonlocal used
+        if not current:
+            return
+        entry = "".join(current)
+        if dropped:
+            entry += f"[... {dropped} more bytes of this file's diff not shown]\n"
+        entries.append(entry)
+        used += _size(entry)
+
+    try:
+        for raw_line in process.proc.stdout:
+            line = raw_line.decode("utf-8", errors="replace")
+            if line.startswith("diff --git "):
+                finish()
+                if used > options.max_total_bytes:
+                    break
+                current, current_bytes, dropped = [], 0, 0
+            if current_bytes + len(raw_line) > options.max_file_bytes:
+                dropped += len(raw_line)
+                continue
+            current.append(line)
+            current_bytes += len(raw_line)
+        else:
+            finish()
+    finally:
+        # Stop git instead of reading the rest of a huge diff
+        if process.proc.poll() is None:
+            process.proc.kill()
+        process.proc.wait()
+    return entries
+
+
+def render_git_diff(repo: git.Repo, args: list[str], options: DiffOptions = DiffOptions()) -> str:
+    """Render the output of git diff with the given arguments within the budgets of options."""
+    files = _list_files(repo, args)
+    page_files = files[options.file_offset : options.file_offset + options.max_files]
+    if options.mode == "name-only":
+        entries = ["\t".join([status, *paths]) + "\n" for status, paths in page_files]
+        return _paginate(entries, options, len(files))
+    # Both sides of a rename must be in the pathspec for git to pair them
+    page = [path for _, paths in page_files for path in paths]
+    if not page:
+        return ""
+    if options.mode == "stat":
+        stats = _numstat(repo, args, page)
+        entries = [_stat_line(path, added, removed) for added, removed, path in stats]
+        return _paginate(entries, options, len(files)) + _stat_summary(
+            len(stats),
+            sum(added or 0 for added, _, _ in stats),
+            sum(removed or 0 for _, removed, _ in stats),
+        )
+    return _paginate(_stream_patches(repo, args, page, options), options, len(files))
+
+
+def split_commit_range(repo: git.Repo, target: str) -> tuple[git.Commit, git.Commit] | None:
+    """Resolve a target of the form A..B to two commits, if it is one."""
+    if target.count("..") != 1 or "..." in target:
+        return None
+    a, b = target.split("..")
+    try:
+        return repo.commit(a or "HEAD"), repo.commit(b or "HEAD")
+    except (ValueError, git.BadName, git.BadObject):
+        return None
+
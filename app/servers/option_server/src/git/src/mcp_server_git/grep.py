@@ -0,0 +1,88 @@
+"""Bounded, paginated content search with ``git grep``."""
+
+import os
+from dataclasses import dataclass
+
+import git
+
+DEFAULT_MAX_MATCHES = 100
+MAX_GREP_MATCHES = 1000
+DEFAULT_MAX_GREP_BYTES = 64 * 1024
+# Longer lines, such as minified code, are cut short
+MAX_LINE_CHARS = 500
+GREP_THREADS = os.cpu_count() or 1
+
+
+@dataclass(frozen=True)
+class GrepOptions:
+    ignore_case: bool = False
+    fixed_strings: bool = False
+    max_matches: int = DEFAULT_MAX_MATCHES
+    max_bytes: int = DEFAULT_MAX_GREP_BYTES
+    offset: int = 0
+
+
+def _format_match(record: bytes, prefix: str) -> str:
+    path, line_number, text = record.decode("utf-8", errors="replace").rstrip("\n").split("\0", 2)
+    if path.startswith(prefix):
+        path = path[len(prefix):]
+    if len(text) > MAX_LINE_CHARS:
+        text = text[:MAX_LINE_CHARS] + f" [... {len(text) - MAX_LINE_CHARS} more characters]"
+    return f"{path}:{line_number}:{text}\n"
+
+
+def grep(
+    repo: git.Repo,
+    pattern: str,
+    revision: str | None = None,
+    paths: list[str] | None = None,
+    options: GrepOptions = GrepOptions(),
+) -> tuple[list[str], bool]:
+    """Search tracked files of the working tree, or of revision, for an extended regex.
+
+    Returns the formatted matches of the requested page and whether more
+    matches follow. git is stopped as soon as the page is full, so a pattern
+    matching most of a large repository costs no more than one page.
+    """
+    args = [
+        "--threads", str(GREP_THREADS),
+        "-n", "-I", "--null", "--no-color",
+        "--fixed-strings" if options.fixed_strings else "--extended-regexp",
+    ]
+    if options.ignore_case:
+        args.append("--ignore-case")
+    args += ["-e", pattern]
+    if revision is not None:
+        args.append(revision)
+    process = repo.git.grep(*args, "--", *(paths or []), as_process=True)
+
+    matches: list[str] = []
+    used = 0
+    seen = 0
+    more = False
+    finished = False
+    try:
+        for record in process.proc.stdout:
+            seen += 1
+            if seen <= options.offset:
+                continue
+            match = _format_match(record, f"{revision}:" if revision is not None else "")
+            if len(matches) >= options.max_matches or (
+                matches and used + len(match.encode("utf-8")) > options.max_bytes
+            ):
+                more = True
+                break
+            matches.append(match)
+            used += len(match.encode("utf-8"))
+        else:
+            finished = True
+    finally:
+        # Stop git instead of reading matches that are not returned
+        if not finished and process.proc.poll() is None:
+            process.proc.kill()
+        status = process.proc.wait()
+    # git grep exits with 1 when nothing matches
+    if finished and status not in (0, 1):
+        stderr = process.proc.stderr.read().decode("utf-8", errors="replace")
+        raise git.GitCommandError(["git", "grep", *args], status, stderr)
+    return matches, more
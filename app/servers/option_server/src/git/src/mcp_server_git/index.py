@@ -0,0 +1,266 @@
+"""Incremental SQLite index of commit metadata for fast history search."""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+import git
+
+INDEX_FILENAME = "mcp-commit-index.sqlite3"
+# Number of recently indexed tips remembered to exclude already indexed history
+MAX_INDEXED_TIPS = 32
+INSERT_BATCH_SIZE = 1000
+# Number of reachable commit sets kept in memory, across repositories
+MAX_REACHABLE_SETS = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    oid TEXT PRIMARY KEY,
+    author_name TEXT NOT NULL,
+    author_email TEXT NOT NULL,
+    author_time INTEGER NOT NULL,
+    commit_time INTEGER NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS commits_author_time ON commits (author_time);
+CREATE TABLE IF NOT EXISTS commit_paths (
+    oid TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS commit_paths_path ON commit_paths (path);
+CREATE INDEX IF NOT EXISTS commit_paths_oid ON commit_paths (oid);
+CREATE TABLE IF NOT EXISTS tips (
+    oid TEXT PRIMARY KEY,
+    indexed_at INTEGER NOT NULL
+);
+"""
+
+# Fields of one commit in the output of git log, preceded by a record separator
+LOG_FORMAT = "%x1e%H%x00%an%x00%ae%x00%at%x00%ct%x00%B%x00"
+
+# Binary oids of the commits reachable from a tip, keyed by (index path, tip oid)
+_reachable_sets: OrderedDict[tuple[str, str], frozenset[bytes]] = OrderedDict()
+_reachable_lock = threading.Lock()
+
+
+@dataclass
+class IndexedCommit:
+    oid: str
+    author_name: str
+    author_email: str
+    author_time: int
+    commit_time: int
+    message: str
+    paths: list[str]
+
+    @property
+    def authored_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.author_time, timezone.utc)
+
+
+def parse_date(value: str) -> int:
+    """Parse an ISO 8601 date or datetime into a Unix timestamp, UTC if no zone is given."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+class CommitIndex:
+    """Commit oids, authors, dates, messages and touched paths of a repository.
+
+    The index lives in the git directory and is brought up to date from the
+    previously indexed tips on every call, so only new commits are read.
+    """
+
+    def __init__(self, repo: git.Repo):
+        self.repo = repo
+        self.path = Path(repo.common_dir) / INDEX_FILENAME
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+        return db
+
+    def update(self, revision: str = "HEAD") -> int:
+        """Index the commits reachable from revision, returning how many were new."""
+        tip = self.repo.commit(revision).hexsha
+        with closing(self._connect()) as db:
+            known_tips = [oid for (oid,) in db.execute("SELECT oid FROM tips")]
+            if tip in known_tips:
+                return 0
+            # Tips may have been garbage collected, e.g. after a rebase
+            known_tips = [oid for oid in known_tips if self._exists(oid)]
+
+            process = self.repo.git.log(
+                tip,
+                "--not",
+                *known_tips,
+                "--",
+                format=LOG_FORMAT,
+                name_only=True,
+                z=True,
+                as_process=True,
+            )
+            added = 0
+            with db:
+                batch = []
+                for record in self._read_records(process.proc.stdout):
+                    batch.append(record)
+                    if len(batch) >= INSERT_BATCH_SIZE:
+                        added += self._insert(db, batch)
+                        batch = []
+                added += self._insert(db, batch)
+                process.wait()
+                db.execute(
+                    "INSERT OR REPLACE INTO tips VALUES (?, strftime('%s', 'now'))", (tip,)
+                )
+                db.execute(
+                    "DELETE FROM tips WHERE oid NOT IN "
+                    "(SELECT oid FROM tips ORDER BY indexed_at DESC, rowid DESC LIMIT ?)",
+                    (MAX_INDEXED_TIPS,),
+                )
+        return added
+
+    def reachable(self, tip: str) -> frozenset[bytes]:
+        """Binary oids of the commits reachable from the commit tip.
+
+        The set is read with one rev-list walk and cached per tip. When a branch
+        moved on from the tip searched last, only the new commits are walked.
+        """
+        key = (str(self.path), tip)
+        with _reachable_lock:
+            cached = _reachable_sets.get(key)
+            if cached is not None:
+                _reachable_sets.move_to_end(key)
+                return cached
+            previous = next(
+                ((oid, commits) for (path, oid), commits in reversed(_reachable_sets.items())
+                 if path == key[0]),
+                None,
+            )
+        args = [tip]
+        base: frozenset[bytes] = frozenset()
+        if previous is not None and self.repo.is_ancestor(previous[0], tip):
+            args += ["--not", previous[0]]
+            base = previous[1]
+        output = self.repo.git.rev_list(*args)
+        commits = base.union(bytes.fromhex(oid) for oid in output.split())
+        with _reachable_lock:
+            _reachable_sets[key] = commits
+            while len(_reachable_sets) > MAX_REACHABLE_SETS:
+                _reachable_sets.popitem(last=False)
+        return commits
+
+    def _exists(self, oid: str) -> bool:
+        try:
+            self.repo.odb.info(bytes.fromhex(oid))
+            return True
+        except (ValueError, git.BadName, git.BadObject):
+            return False
+
+    @staticmethod
+    def _read_records(stream):
+        buffer = b""
+        while True:
+            chunk = stream.read(65536)
+            if not chunk:
+                break
+            buffer += chunk
+            *records, buffer = buffer.split(b"\x1e")
+            for record in records:
+                if record:
+                    yield record
+        if buffer:
+            yield buffer
+
+    @staticmethod
+    def _insert(db: sqlite3.Connection, records: list[bytes]) -> int:
+        added = 0
+        for record in records:
+            oid, name, email, author_time, commit_time, message, *touched = (
+                record.decode("utf-8", errors="replace").split("\0")
+            )
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO commits VALUES (?, ?, ?, ?, ?, ?)",
+                (oid, name, email, int(author_time), int(commit_time), message),
+            )
+            # A commit indexed before already has its paths
+            if cursor.rowcount:
+                added += 1
+                # With -z, git starts the list of names on a new line
+                paths = {path.lstrip("\n") for path in touched} - {""}
+                db.executemany(
+                    "INSERT INTO commit_paths VALUES (?, ?)",
+                    [(oid, path) for path in sorted(paths)],
+                )
+        return added
+
+    def search(
+        self,
+        author: str | None = None,
+        path: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        message: str | None = None,
+        max_count: int = 20,
+        skip: int = 0,
+        revision: str | None = None,
+    ) -> list[IndexedCommit]:
+        """Find indexed commits, newest first.
+
+        author and message match case-insensitive substrings, path matches a
+        file or everything below a directory, and since/until bound the author
+        date with ISO 8601 dates. With a revision, only commits reachable from
+        it are returned.
+        """
+        conditions = []
+        params: list = []
+        if author:
+            conditions.append("(author_name LIKE ? OR author_email LIKE ?)")
+            params += [f"%{author}%", f"%{author}%"]
+        if message:
+            conditions.append("message LIKE ?")
+            params.append(f"%{message}%")
+        if since:
+            conditions.append("author_time >= ?")
+            params.append(parse_date(since))
+        if until:
+            conditions.append("author_time <= ?")
+            params.append(parse_date(until))
+        if path:
+            path = path.strip("/")
+            conditions.append(
+                "oid IN (SELECT oid FROM commit_paths WHERE path = ? OR path LIKE ? ESCAPE '\\')"
+            )
+            escaped = path.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params += [path, f"{escaped}/%"]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT * FROM commits {where} ORDER BY commit_time DESC, oid"
+        reachable = self.reachable(self.repo.commit(revision).hexsha) if revision is not None else None
+
+        with closing(self._connect()) as db:
+            if reachable is None:
+                rows = db.execute(f"{query} LIMIT ? OFFSET ?", (*params, max_count, skip)).fetchall()
+            else:
+                # The index also holds the history of every other indexed revision
+                rows = list(islice(
+                    (row for row in db.execute(query, params) if bytes.fromhex(row[0]) in reachable),
+                    skip,
+                    skip + max_count,
+                ))
+            commits = []
+            for row in rows:
+                touched = [
+                    p for (p,) in db.execute(
+                        "SELECT path FROM commit_paths WHERE oid = ? ORDER BY path", (row[0],)
+                    )
+                ]
+                commits.append(IndexedCommit(*row, paths=touched))
+        return commits
@@ -0,0 +1,104 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Callable, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+class ReadWriteLock:
+    """Asyncio lock admitting many readers or a single writer.
+
+    Waiting writers block new readers, so a steady stream of reads cannot
+    starve a commit.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: not self._writer and not self._waiting_writers
+            )
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[None]:
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(
+                    lambda: not self._writer and not self._readers
+                )
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class RepoScheduler:
+    """Runs blocking git work in a thread pool, scheduled per repository.
+
+    Reads of a repository run concurrently, while writes to it run one at a
+    time and never overlap reads. Different repositories do not wait for each
+    other.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="mcp-git")
+        self._locks: dict[Path, tuple[ReadWriteLock, int]] = {}
+
+    @asynccontextmanager
+    async def _lock(self, repo_path: str | Path, write: bool) -> AsyncIterator[None]:
+        key = Path(repo_path).resolve()
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = ReadWriteLock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock.write() if write else lock.read():
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users <= 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    async def run(
+        self, repo_path: str | Path, write: bool, fn: Callable[..., T], *args
+    ) -> T:
+        """Run fn(*args) in the thread pool while holding the repository lock."""
+        async with self._lock(repo_path, write):
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, fn, *args)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The thread cannot be stopped, so keep the lock until it is done
+                await asyncio.wait([future])
+                raise
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
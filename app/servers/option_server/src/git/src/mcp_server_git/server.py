@@ -1,30 +1,79 @@
+import asyncio
+import itertools
 import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
 from pathlib import Path
-from typing import Sequence
+from typing import Any, Callable, Iterable, Sequence
+from urllib.parse import unquote, urlparse
 from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.session import ServerSession
 from mcp.server.stdio import stdio_server
 from mcp.types import (
     ClientCapabilities,
+    Resource,
     TextContent,
     Tool,
     ListRootsResult,
     RootsCapability,
+    RootsListChangedNotification,
 )
 from enum import Enum
 import git
-from pydantic import BaseModel
+from pydantic import AnyUrl, BaseModel, Field
+
+from .diff import (
+    DEFAULT_MAX_FILE_BYTES,
+    DEFAULT_MAX_FILES,
+    DEFAULT_MAX_TOTAL_BYTES,
+    DiffMode,
+    DiffOptions,
+    render_git_diff,
+    split_commit_range,
+)
+from .grep import DEFAULT_MAX_GREP_BYTES, DEFAULT_MAX_MATCHES, MAX_GREP_MATCHES, GrepOptions, grep
+from .index import CommitIndex
+from .backend import SharedRepo, iter_commits, read_head_state
+from .status import StatusCache, render_porcelain_v2, run_status
+from .scheduler import DEFAULT_MAX_WORKERS, RepoScheduler
+from .watcher import DEFAULT_POLL_INTERVAL, RepoChange, RepoWatcher
+
+# Largest page of commits git_log returns at once
+MAX_LOG_PAGE_SIZE = 500
+# Touched files listed per commit by git_search_commits
+MAX_SEARCH_FILES = 20
+# Deeper pages are skipped by rev-list, which is faster than walking them in Python
+MAX_WALK_SKIP = 1000
+MAX_BATCH_OPERATIONS = 20
+# A root commit is diffed against the empty tree, which git knows without storing it
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
 
 class GitStatus(BaseModel):
     repo_path: str
+    porcelain: bool = False
+
+class DiffParameters(BaseModel):
+    mode: DiffMode = "patch"
+    max_file_bytes: int = Field(default=DEFAULT_MAX_FILE_BYTES, ge=1)
+    max_total_bytes: int = Field(default=DEFAULT_MAX_TOTAL_BYTES, ge=1)
+    file_offset: int = Field(default=0, ge=0)
+    max_files: int = Field(default=DEFAULT_MAX_FILES, ge=1)
 
-class GitDiffUnstaged(BaseModel):
+    def diff_options(self) -> DiffOptions:
+        return DiffOptions(
+            self.mode, self.max_file_bytes, self.max_total_bytes, self.file_offset, self.max_files
+        )
+
+class GitDiffUnstaged(DiffParameters):
     repo_path: str
 
-class GitDiffStaged(BaseModel):
+class GitDiffStaged(DiffParameters):
     repo_path: str
 
-class GitDiff(BaseModel):
+class GitDiff(DiffParameters):
     repo_path: str
     target: str
 
@@ -41,7 +90,14 @@ class GitReset(BaseModel):
 
 class GitLog(BaseModel):
     repo_path: str
-    max_count: int = 10
+    max_count: int = Field(default=10, ge=1, le=MAX_LOG_PAGE_SIZE)
+    skip: int = Field(default=0, ge=0)
+    revision: str = "HEAD"
+    author: str | None = None
+    paths: list[str] | None = None
+    since: str | None = None
+    until: str | None = None
+    grep: str | None = None
 
 class GitCreateBranch(BaseModel):
     repo_path: str
@@ -52,13 +108,49 @@ class GitCheckout(BaseModel):
     repo_path: str
     branch_name: str
 
-class GitShow(BaseModel):
+class GitShow(DiffParameters):
     repo_path: str
     revision: str
 
 class GitInit(BaseModel):
     repo_path: str
 
+class GitClone(BaseModel):
+    repo_path: str
+    url: str
+    branch: str | None = None
+    depth: int | None = Field(default=None, ge=1)
+    filter: str | None = Field(default=None, pattern=r"^(blob:none|blob:limit=\d+[kmg]?|tree:0)$")
+    single_branch: bool = False
+    sparse_paths: list[str] | None = None
+
+class GitSearchCommits(BaseModel):
+    repo_path: str
+    author: str | None = None
+    path: str | None = None
+    since: str | None = None
+    until: str | None = None
+    message: str | None = None
+    revision: str = "HEAD"
+    max_count: int = Field(default=20, ge=1, le=MAX_LOG_PAGE_SIZE)
+    skip: int = Field(default=0, ge=0)
+
+class GitGrep(BaseModel):
+    repo_path: str
+    pattern: str
+    revision: str | None = None
+    paths: list[str] | None = None
+    ignore_case: bool = False
+    fixed_strings: bool = False
+    max_matches: int = Field(default=DEFAULT_MAX_MATCHES, ge=1, le=MAX_GREP_MATCHES)
+    max_bytes: int = Field(default=DEFAULT_MAX_GREP_BYTES, ge=1)
+    offset: int = Field(default=0, ge=0)
+
+    def grep_options(self) -> GrepOptions:
+        return GrepOptions(
+            self.ignore_case, self.fixed_strings, self.max_matches, self.max_bytes, self.offset
+        )
+
 class GitTools(str, Enum):
     STATUS = "git_status"
     DIFF_UNSTAGED = "git_diff_unstaged"
@@ -72,18 +164,183 @@ class GitTools(str, Enum):
     CHECKOUT = "git_checkout"
     SHOW = "git_show"
     INIT = "git_init"
+    SEARCH_COMMITS = "git_search_commits"
+    GREP = "git_grep"
+    BATCH = "git_batch"
+    CLONE = "git_clone"
+
+class GitBatchOperation(BaseModel):
+    tool: GitTools
+    arguments: dict[str, Any] = {}
+
+class GitBatch(BaseModel):
+    repo_path: str
+    operations: list[GitBatchOperation] = Field(min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+# Tools that change the repository, which must not run alongside other tools on it
+WRITE_TOOLS = {
+    GitTools.COMMIT,
+    GitTools.ADD,
+    GitTools.RESET,
+    GitTools.CREATE_BRANCH,
+    GitTools.CHECKOUT,
+    GitTools.INIT,
+    GitTools.CLONE,
+}
+
+DEFAULT_REPO_CACHE_SIZE = 32
+
+class RepoCache:
+    """Bounded LRU cache of open Repo objects keyed by resolved path.
+
+    Opening a Repo discovers the git directory and parses its config, which
+    adds up when a burst of tool calls targets the same repository. Entries
+    are dropped when the git directory disappears or HEAD moves.
+
+    Every thread shares the Repo of a path, together with its long-running
+    cat-file processes, which a SharedRepo guards with a lock.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_REPO_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Path, tuple[git.Repo, tuple]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, repo_path: str | Path) -> git.Repo:
+        """Get the Repo at repo_path, opening it if it is not cached or stale.
+
+        Raises git.InvalidGitRepositoryError or git.NoSuchPathError like git.Repo.
+        """
+        path = Path(repo_path).resolve()
+        with self._lock:
+            cached = self._entries.get(path)
+        if cached is not None:
+            repo, state = cached
+            if self._is_current(repo, state):
+                with self._lock:
+                    if path in self._entries:
+                        self._entries.move_to_end(path)
+                return repo
+            self._drop([path])
+
+        repo = SharedRepo(path)
+        state = read_head_state(repo.git_dir)
+        if state is not None:
+            with self._lock:
+                # Another thread may have opened the repository meanwhile
+                cached = self._entries.get(path)
+                if cached is not None and cached[1] == state:
+                    return cached[0]
+                self._entries[path] = (repo, state)
+                self._entries.move_to_end(path)
+                evicted = list(self._entries)[: max(len(self._entries) - self.max_entries, 0)]
+            self._drop(evicted)
+        return repo
+
+    def invalidate(self, repo_path: str | Path | None = None) -> None:
+        """Drop the cached Repo objects of one path, or all of them."""
+        path = Path(repo_path).resolve() if repo_path is not None else None
+        with self._lock:
+            keys = [key for key in self._entries if path is None or key == path]
+        self._drop(keys)
+
+    def _drop(self, keys: list[Path]) -> None:
+        with self._lock:
+            for key in keys:
+                # Another thread may still be using the Repo, so it is closed by
+                # the GC once the last reference goes away
+                self._entries.pop(key, None)
+
+    @staticmethod
+    def _is_current(repo: git.Repo, state: tuple) -> bool:
+        # A worktree or submodule points to its git directory through a .git file
+        if repo.working_tree_dir and not os.path.exists(os.path.join(repo.working_tree_dir, ".git")):
+            return False
+        return read_head_state(repo.git_dir) == state
+
+DEFAULT_RESULT_CACHE_BYTES = 32 * 1024 * 1024
+
+class ResultCache:
+    """Size-bounded LRU cache of rendered output for immutable objects.
+
+    Keys name commits and trees by oid together with the rendering options, so
+    an entry never goes stale and can be shared by every repository.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> str | None:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: tuple, result: str) -> None:
+        size = len(result)
+        # A single entry may not take more than an eighth of the cache
+        if size > self.max_bytes // 8:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = result
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
 
 def git_status(repo: git.Repo) -> str:
     return repo.git.status()
 
-def git_diff_unstaged(repo: git.Repo) -> str:
-    return repo.git.diff()
+def git_status_porcelain(repo: git.Repo, status_cache: StatusCache | None = None) -> str:
+    if status_cache is None:
+        return render_porcelain_v2(*run_status(repo))
+    return status_cache.get(repo).status(repo)
+
+def git_diff_unstaged(repo: git.Repo, options: DiffOptions = DiffOptions()) -> str:
+    return render_git_diff(repo, [], options)
+
+def git_diff_staged(repo: git.Repo, options: DiffOptions = DiffOptions()) -> str:
+    return render_git_diff(repo, ["--cached"], options)
 
-def git_diff_staged(repo: git.Repo) -> str:
-    return repo.git.diff("--cached")
+def git_diff(
+    repo: git.Repo,
+    target: str,
+    options: DiffOptions = DiffOptions(),
+    result_cache: ResultCache | None = None,
+) -> str:
+    if target.startswith("-"):
+        raise ValueError(f"Invalid diff target: {target}")
+    commits = split_commit_range(repo, target)
+    if commits is None:
+        return render_git_diff(repo, [target], options)
 
-def git_diff(repo: git.Repo, target: str) -> str:
-    return repo.git.diff(target)
+    # Both sides are commits, so the trees can be compared without the working tree
+    a, b = commits
+    key = ("diff", a.tree.hexsha, b.tree.hexsha, options)
+    result = result_cache.get(key) if result_cache is not None else None
+    if result is None:
+        result = render_git_diff(repo, [a.tree.hexsha, b.tree.hexsha], options)
+        if result_cache is not None:
+            result_cache.put(key, result)
+    return result
 
 def git_commit(repo: git.Repo, message: str) -> str:
     commit = repo.index.commit(message)
@@ -97,8 +354,30 @@ def git_reset(repo: git.Repo) -> str:
     repo.index.reset()
     return "All staged changes reset"
 
-def git_log(repo: git.Repo, max_count: int = 10) -> list[str]:
-    commits = list(repo.iter_commits(max_count=max_count))
+def git_log(
+    repo: git.Repo,
+    max_count: int = 10,
+    skip: int = 0,
+    revision: str = "HEAD",
+    author: str | None = None,
+    paths: list[str] | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    grep: str | None = None,
+) -> list[str]:
+    start = repo.commit(revision)
+    filters = {
+        key: value
+        for key, value in (("author", author), ("since", since), ("until", until), ("grep", grep))
+        if value
+    }
+    if filters or paths or skip > MAX_WALK_SKIP:
+        # Let rev-list filter and skip, and stop reading once the page is full
+        commits = repo.iter_commits(
+            start.hexsha, paths or "", max_count=max_count, skip=skip, **filters
+        )
+    else:
+        commits = itertools.islice(iter_commits(repo, start.hexsha), skip, skip + max_count)
     log = []
     for commit in commits:
         log.append(
@@ -109,6 +388,66 @@ def git_log(repo: git.Repo, max_count: int = 10) -> list[str]:
         )
     return log
 
+def git_search_commits(
+    repo: git.Repo,
+    author: str | None = None,
+    path: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    message: str | None = None,
+    revision: str = "HEAD",
+    max_count: int = 20,
+    skip: int = 0,
+) -> list[str]:
+    index = CommitIndex(repo)
+    index.update(revision)
+    results = []
+    for commit in index.search(author, path, since, until, message, max_count, skip, revision):
+        files = "".join(f"  {p}\n" for p in commit.paths[:MAX_SEARCH_FILES])
+        if len(commit.paths) > MAX_SEARCH_FILES:
+            files += f"  ... and {len(commit.paths) - MAX_SEARCH_FILES} more\n"
+        results.append(
+            f"Commit: {commit.oid}\n"
+            f"Author: {commit.author_name} <{commit.author_email}>\n"
+            f"Date: {commit.authored_datetime}\n"
+            f"Message: {commit.message}\n"
+            f"Files:\n{files}"
+        )
+    return results
+
+def git_grep(
+    repo: git.Repo,
+    pattern: str,
+    revision: str | None = None,
+    paths: list[str] | None = None,
+    options: GrepOptions = GrepOptions(),
+    result_cache: ResultCache | None = None,
+) -> str:
+    key = None
+    if revision is not None:
+        if revision.startswith("-"):
+            raise ValueError(f"Invalid revision: {revision}")
+        # Pin the search to an object, so that later pages stay stable and can be cached
+        revision = repo.rev_parse(revision).hexsha
+        key = ("grep", revision, pattern, tuple(paths or ()), options)
+    if key is not None and result_cache is not None:
+        result = result_cache.get(key)
+        if result is not None:
+            return result
+
+    matches, more = grep(repo, pattern, revision, paths, options)
+    result = "".join(matches) or "No matches\n"
+    if more:
+        next_offset = options.offset + len(matches)
+        result += (
+            f"\n[Showing matches {options.offset + 1}-{next_offset}. Call again with offset {next_offset}"
+            + (f" and revision {revision}" if revision is not None else "")
+            + " to see more.]\n"
+        )
+    if key is not None and result_cache is not None:
+        result_cache.put(key, result)
+    return result
+
 def git_create_branch(repo: git.Repo, branch_name: str, base_branch: str | None = None) -> str:
     if base_branch:
         base = repo.refs[base_branch]
@@ -129,33 +468,203 @@ def git_init(repo_path: str) -> str:
     except Exception as e:
         return f"Error initializing repository: {str(e)}"
 
-def git_show(repo: git.Repo, revision: str) -> str:
+class CloneProgress(git.RemoteProgress):
+    """Reports the stages of a clone as one increasing value, 100 per stage."""
+
+    def __init__(self, report: Callable[[float, float | None], None]):
+        super().__init__()
+        self.report = report
+        self._stage = None
+        self._completed_stages = 0
+        self._reported = -1
+
+    def update(self, op_code, cur_count, max_count=None, message="") -> None:
+        stage = op_code & self.OP_MASK
+        if stage != self._stage:
+            if self._stage is not None:
+                self._completed_stages += 1
+            self._stage = stage
+        fraction = float(cur_count) / float(max_count) if max_count else 0.0
+        progress = self._completed_stages * 100 + int(min(fraction, 1.0) * 100)
+        # git reports every object, so only pass on whole percents
+        if progress > self._reported:
+            self._reported = progress
+            self.report(progress, None)
+
+def git_clone(
+    url: str,
+    repo_path: str,
+    branch: str | None = None,
+    depth: int | None = None,
+    filter_spec: str | None = None,
+    single_branch: bool = False,
+    sparse_paths: list[str] | None = None,
+    progress: Callable[[float, float | None], None] | None = None,
+) -> str:
+    if url.startswith("-"):
+        raise ValueError(f"Invalid clone URL: {url}")
+    options = []
+    if branch:
+        options.append(f"--branch={branch}")
+    if depth:
+        options.append(f"--depth={depth}")
+    if filter_spec:
+        options.append(f"--filter={filter_spec}")
+    if single_branch:
+        options.append("--single-branch")
+    if sparse_paths is not None:
+        # Only files at the top level are checked out until the cone is set
+        options.append("--sparse")
+    repo = git.Repo.clone_from(
+        url,
+        repo_path,
+        progress=CloneProgress(progress) if progress is not None else None,
+        multi_options=options,
+    )
+    try:
+        if sparse_paths:
+            # With a filter, blobs of the cone are fetched in one batch here
+            repo.git.sparse_checkout("set", "--cone", "--", *sparse_paths)
+        return f"Cloned {url} into {repo.working_tree_dir}"
+    finally:
+        repo.close()
+
+def git_show(
+    repo: git.Repo,
+    revision: str,
+    options: DiffOptions = DiffOptions(),
+    result_cache: ResultCache | None = None,
+) -> str:
     commit = repo.commit(revision)
+    key = ("show", commit.hexsha, options)
+    if result_cache is not None:
+        result = result_cache.get(key)
+        if result is not None:
+            return result
     output = [
         f"Commit: {commit.hexsha}\n"
         f"Author: {commit.author}\n"
         f"Date: {commit.authored_datetime}\n"
         f"Message: {commit.message}\n"
     ]
-    if commit.parents:
-        parent = commit.parents[0]
-        diff = parent.diff(commit, create_patch=True)
-    else:
-        diff = commit.diff(git.NULL_TREE, create_patch=True)
-    for d in diff:
-        output.append(f"\n--- {d.a_path}\n+++ {d.b_path}\n")
-        output.append(d.diff.decode('utf-8'))
-    return "".join(output)
+    parent_tree = commit.parents[0].tree.hexsha if commit.parents else EMPTY_TREE
+    output.append(render_git_diff(repo, [parent_tree, commit.tree.hexsha], options))
+    result = "".join(output)
+    if result_cache is not None:
+        result_cache.put(key, result)
+    return result
+
+async def git_batch(
+    scheduler: RepoScheduler,
+    run_tool: Callable[[str, dict], list[TextContent]],
+    batch: GitBatch,
+) -> list[TextContent]:
+    """Run the operations of a batch in order, with consecutive reads running concurrently.
+
+    A failed operation is reported in its result and does not stop the batch.
+    """
+    results: list[TextContent | None] = [None] * len(batch.operations)
+
+    async def run(index: int, operation: GitBatchOperation) -> None:
+        header = f"{index + 1}. {operation.tool.value}\n"
+        try:
+            if operation.tool == GitTools.BATCH:
+                raise ValueError("Batches cannot be nested")
+            arguments = {**operation.arguments, "repo_path": batch.repo_path}
+            contents = await scheduler.run(
+                batch.repo_path, operation.tool in WRITE_TOOLS, run_tool, operation.tool, arguments
+            )
+            text = "\n".join(content.text for content in contents)
+        except Exception as e:
+            text = f"Error: {e}"
+        results[index] = TextContent(type="text", text=header + text)
+
+    reads: list[asyncio.Task] = []
+    for index, operation in enumerate(batch.operations):
+        if operation.tool in WRITE_TOOLS:
+            # A write sees the effects of everything before it, and nothing after it
+            await asyncio.gather(*reads)
+            reads = []
+            await run(index, operation)
+        else:
+            reads.append(asyncio.ensure_future(run(index, operation)))
+    await asyncio.gather(*reads)
+    return results
+
+async def find_repos(
+    scheduler: RepoScheduler,
+    open_repo: Callable[[str], git.Repo],
+    paths: Sequence[str],
+) -> list[str]:
+    """Open the repositories at paths concurrently, keeping the paths that are repositories."""
+
+    def find(path: str) -> str | None:
+        try:
+            open_repo(path)
+            return path
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError):
+            return None
 
-async def serve(repository: Path | None) -> None:
+    found = await asyncio.gather(*(scheduler.run(path, False, find, path) for path in paths))
+    return [path for path in found if path is not None]
+
+def repo_resource_uri(repo_path: str | Path) -> str:
+    """URI of the resource describing the state of a repository, like git:///path/to/repo."""
+    return "git" + Path(repo_path).resolve().as_uri()[len("file"):]
+
+def repo_resource_path(uri: str | AnyUrl) -> Path:
+    parsed = urlparse(str(uri))
+    if parsed.scheme != "git":
+        raise ValueError(f"Unknown resource: {uri}")
+    return Path(unquote(parsed.path))
+
+def git_repo_state(repo: git.Repo, status_cache: StatusCache | None = None) -> str:
+    head = git_log(repo, 1)[0] if repo.head.is_valid() else "No commits yet\n"
+    return f"{head}\n{git_status_porcelain(repo, status_cache)}"
+
+async def serve(
+    repository: Path | None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    track_changes: bool = False,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+) -> None:
     logger = logging.getLogger(__name__)
+    loop = asyncio.get_running_loop()
+    repo_cache = RepoCache()
+    result_cache = ResultCache()
+    status_cache = StatusCache(track_changes)
+    scheduler = RepoScheduler(max_workers)
+    # Sessions subscribed to each resource URI
+    subscriptions: dict[str, set[ServerSession]] = {}
+
+    async def notify_updated(uri: str) -> None:
+        for session in list(subscriptions.get(uri, ())):
+            try:
+                await session.send_resource_updated(AnyUrl(uri))
+            except Exception as e:
+                logger.debug(f"Dropping subscription to {uri}: {e}")
+                subscriptions[uri].discard(session)
+
+    def on_repo_change(change: RepoChange) -> None:
+        # Cached results of shows and diffs are keyed by oid and stay valid
+        repo_cache.invalidate(change.path)
+        if change.refs_changed:
+            # Index writes alone are detected by the status itself, which also writes the index
+            status_cache.invalidate(change.git_dir)
+        uri = repo_resource_uri(change.path)
+        if subscriptions.get(uri):
+            asyncio.run_coroutine_threadsafe(notify_updated(uri), loop)
+
+    watcher = RepoWatcher(on_repo_change, poll_interval)
 
     if repository is not None:
         try:
-            git.Repo(repository)
+            repo = repo_cache.get(repository)
+            watcher.watch(repository, repo.git_dir)
             logger.info(f"Using repository at {repository}")
         except git.InvalidGitRepositoryError:
             logger.error(f"{repository} is not a valid Git repository")
+            watcher.close()
             return
 
     server = Server("mcp-git")
@@ -222,29 +731,58 @@ async def serve(repository: Path | None) -> None:
                 name=GitTools.INIT,
                 description="Initialize a new Git repository",
                 inputSchema=GitInit.schema(),
-            )
+            ),
+            Tool(
+                name=GitTools.CLONE,
+                description="Clones a repository, optionally partial (filter), shallow (depth), single-branch or sparse (cone paths), reporting progress",
+                inputSchema=GitClone.schema(),
+            ),
+            Tool(
+                name=GitTools.SEARCH_COMMITS,
+                description="Searches the commit history by author, touched path, date range and message using an incrementally updated index",
+                inputSchema=GitSearchCommits.schema(),
+            ),
+            Tool(
+                name=GitTools.GREP,
+                description="Searches file contents of the working tree or a revision with an extended regular expression, returning a bounded page of matches",
+                inputSchema=GitGrep.schema(),
+            ),
+            Tool(
+                name=GitTools.BATCH,
+                description="Runs several git tools against one repository in a single call, running read-only tools concurrently",
+                inputSchema=GitBatch.schema(),
+            ),
         ]
 
+    # Repositories among the roots of each session, kept until the client changes its roots
+    repos_by_session: weakref.WeakKeyDictionary[ServerSession, list[str]] = weakref.WeakKeyDictionary()
+
+    async def roots_list_changed(notification: RootsListChangedNotification) -> None:
+        # Notification handlers are not told which session sent them
+        repos_by_session.clear()
+
+    # The low-level server has no decorator for this notification
+    server.notification_handlers[RootsListChangedNotification] = roots_list_changed
+
     async def list_repos() -> Sequence[str]:
         async def by_roots() -> Sequence[str]:
-            if not isinstance(server.request_context.session, ServerSession):
+            session = server.request_context.session
+            if not isinstance(session, ServerSession):
                 raise TypeError("server.request_context.session must be a ServerSession")
 
-            if not server.request_context.session.check_client_capability(
+            if not session.check_client_capability(
                 ClientCapabilities(roots=RootsCapability())
             ):
                 return []
 
-            roots_result: ListRootsResult = await server.request_context.session.list_roots()
+            cached = repos_by_session.get(session)
+            if cached is not None:
+                return cached
+            roots_result: ListRootsResult = await session.list_roots()
             logger.debug(f"Roots result: {roots_result}")
-            repo_paths = []
-            for root in roots_result.roots:
-                path = root.uri.path
-                try:
-                    git.Repo(path)
-                    repo_paths.append(str(path))
-                except git.InvalidGitRepositoryError:
-                    pass
+            paths = [unquote(root.uri.path) for root in roots_result.roots if root.uri.path]
+            repo_paths = await find_repos(scheduler, open_repo, paths)
+            repos_by_session[session] = repo_paths
             return repo_paths
 
         def by_commandline() -> Sequence[str]:
@@ -254,23 +792,88 @@ async def serve(repository: Path | None) -> None:
         root_repos = await by_roots()
         return [*root_repos, *cmd_repos]
 
-    @server.call_tool()
-    async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+    def open_repo(repo_path: str | Path) -> git.Repo:
+        repo = repo_cache.get(repo_path)
+        watcher.watch(repo_path, repo.git_dir)
+        return repo
+
+    @server.list_resources()
+    async def list_resources() -> list[Resource]:
+        # Opening the repositories of the roots also watches them
+        await list_repos()
+        return [
+            Resource(
+                uri=repo_resource_uri(path),
+                name=f"{path.name} repository state",
+                description=f"Last commit and porcelain status of {path}, updated when HEAD, refs or the index change",
+                mimeType="text/plain",
+            )
+            for path in watcher.watched()
+        ]
+
+    @server.read_resource()
+    async def read_resource(uri: AnyUrl) -> Iterable[ReadResourceContents]:
+        path = repo_resource_path(uri)
+
+        def read() -> str:
+            return git_repo_state(open_repo(path), status_cache)
+
+        text = await scheduler.run(path, False, read)
+        return [ReadResourceContents(content=text, mime_type="text/plain")]
+
+    @server.subscribe_resource()
+    async def subscribe_resource(uri: AnyUrl) -> None:
+        path = repo_resource_path(uri)
+        await scheduler.run(path, False, open_repo, path)
+        subscriptions.setdefault(repo_resource_uri(path), set()).add(server.request_context.session)
+
+    @server.unsubscribe_resource()
+    async def unsubscribe_resource(uri: AnyUrl) -> None:
+        path = repo_resource_path(uri)
+        subscriptions.get(repo_resource_uri(path), set()).discard(server.request_context.session)
+
+    def run_tool(
+        name: str,
+        arguments: dict,
+        progress: Callable[[float, float | None], None] | None = None,
+    ) -> list[TextContent]:
         repo_path = Path(arguments["repo_path"])
-        
-        # Handle git init separately since it doesn't require an existing repo
+
+        # Handle git init and clone separately since they don't require an existing repo
         if name == GitTools.INIT:
             result = git_init(str(repo_path))
             return [TextContent(
                 type="text",
                 text=result
             )]
+
+        if name == GitTools.CLONE:
+            args = GitClone(**arguments)
+            result = git_clone(
+                args.url,
+                str(repo_path),
+                args.branch,
+                args.depth,
+                args.filter,
+                args.single_branch,
+                args.sparse_paths,
+                progress,
+            )
+            return [TextContent(
+                type="text",
+                text=result
+            )]
             
         # For all other commands, we need an existing repo
-        repo = git.Repo(repo_path)
+        repo = open_repo(repo_path)
 
         match name:
             case GitTools.STATUS:
+                if GitStatus(**arguments).porcelain:
+                    return [TextContent(
+                        type="text",
+                        text=git_status_porcelain(repo, status_cache)
+                    )]
                 status = git_status(repo)
                 return [TextContent(
                     type="text",
@@ -278,21 +881,23 @@ async def serve(repository: Path | None) -> None:
                 )]
 
             case GitTools.DIFF_UNSTAGED:
-                diff = git_diff_unstaged(repo)
+                diff = git_diff_unstaged(repo, GitDiffUnstaged(**arguments).diff_options())
                 return [TextContent(
                     type="text",
                     text=f"Unstaged changes:\n{diff}"
                 )]
 
             case GitTools.DIFF_STAGED:
-                diff = git_diff_staged(repo)
+                diff = git_diff_staged(repo, GitDiffStaged(**arguments).diff_options())
                 return [TextContent(
                     type="text",
                     text=f"Staged changes:\n{diff}"
                 )]
 
             case GitTools.DIFF:
-                diff = git_diff(repo, arguments["target"])
+                diff = git_diff(
+                    repo, arguments["target"], GitDiff(**arguments).diff_options(), result_cache
+                )
                 return [TextContent(
                     type="text",
                     text=f"Diff with {arguments['target']}:\n{diff}"
@@ -320,10 +925,29 @@ async def serve(repository: Path | None) -> None:
                 )]
 
             case GitTools.LOG:
-                log = git_log(repo, arguments.get("max_count", 10))
+                args = GitLog(**arguments)
+                # Pin the page to a commit so that later pages stay stable when the branch moves
+                start = repo.commit(args.revision).hexsha
+                log = git_log(
+                    repo,
+                    args.max_count + 1,
+                    args.skip,
+                    start,
+                    args.author,
+                    args.paths,
+                    args.since,
+                    args.until,
+                    args.grep,
+                )
+                text = "Commit history:\n" + "\n".join(log[:args.max_count])
+                if len(log) > args.max_count:
+                    text += (
+                        f"\nMore commits available. Call git_log with revision {start} "
+                        f"and skip {args.skip + args.max_count} to get the next page."
+                    )
                 return [TextContent(
                     type="text",
-                    text="Commit history:\n" + "\n".join(log)
+                    text=text
                 )]
 
             case GitTools.CREATE_BRANCH:
@@ -345,7 +969,37 @@ async def serve(repository: Path | None) -> None:
                 )]
 
             case GitTools.SHOW:
-                result = git_show(repo, arguments["revision"])
+                result = git_show(
+                    repo, arguments["revision"], GitShow(**arguments).diff_options(), result_cache
+                )
+                return [TextContent(
+                    type="text",
+                    text=result
+                )]
+
+            case GitTools.SEARCH_COMMITS:
+                args = GitSearchCommits(**arguments)
+                results = git_search_commits(
+                    repo,
+                    args.author,
+                    args.path,
+                    args.since,
+                    args.until,
+                    args.message,
+                    args.revision,
+                    args.max_count,
+                    args.skip,
+                )
+                return [TextContent(
+                    type="text",
+                    text="Matching commits:\n" + "\n".join(results) if results else "No matching commits"
+                )]
+
+            case GitTools.GREP:
+                args = GitGrep(**arguments)
+                result = git_grep(
+                    repo, args.pattern, args.revision, args.paths, args.grep_options(), result_cache
+                )
                 return [TextContent(
                     type="text",
                     text=result
@@ -354,6 +1008,32 @@ async def serve(repository: Path | None) -> None:
             case _:
                 raise ValueError(f"Unknown tool: {name}")
 
+    @server.call_tool()
+    async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+        if name == GitTools.BATCH:
+            return await git_batch(scheduler, run_tool, GitBatch(**arguments))
+
+        progress = None
+        context = server.request_context
+        token = context.meta.progressToken if context.meta is not None else None
+        if token is not None:
+            def progress(done: float, total: float | None) -> None:
+                # Called from a worker thread
+                asyncio.run_coroutine_threadsafe(
+                    context.session.send_progress_notification(token, done, total), loop
+                )
+
+        return await scheduler.run(
+            arguments["repo_path"], name in WRITE_TOOLS, run_tool, name, arguments, progress
+        )
+
     options = server.create_initialization_options()
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, options, raise_exceptions=True)
+    # The low-level server does not advertise subscriptions on its own
+    options.capabilities.resources.subscribe = True
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, options, raise_exceptions=True)
+    finally:
+        watcher.close()
+        scheduler.close()
+        status_cache.close()
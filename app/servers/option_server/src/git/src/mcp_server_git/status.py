@@ -0,0 +1,234 @@
+"""Fast, incremental ``git status`` in porcelain v2 format for large working trees.
+
+Each status runs with the untracked cache and parallel index preloading
+enabled, and lets git write back refreshed stat data to the index, so clean
+files are not read again on the next call. With the optional ``watchdog``
+package, a change tracker also records which paths changed since the last
+call, and only those paths are passed to git.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import git
+
+from .backend import read_head_state
+
+try:
+    from watchdog.events import FileSystemEvent, FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional dependency
+    FileSystemEvent = None
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+STATUS_OPTIONS = [
+    "-c", "core.untrackedCache=true",
+    "-c", "core.preloadIndex=true",
+    "status", "--porcelain=v2", "-z", "--branch", "--untracked-files=all",
+]
+# With more changed paths than this, one full status is cheaper than many pathspecs
+MAX_INCREMENTAL_PATHS = 256
+# How long to wait for the tracker to see its own cookie file before giving up on it
+SYNC_TIMEOUT = 1.0
+DEFAULT_STATUS_CACHE_SIZE = 16
+
+
+def parse_porcelain_v2(output: str) -> tuple[list[str], dict[str, str]]:
+    """Split ``git status --porcelain=v2 -z`` output into headers and entries by path.
+
+    Entries are rendered like the newline-separated porcelain v2 format, where
+    a rename lists its original path after a tab.
+    """
+    headers = []
+    entries = {}
+    records = iter(output.split("\0"))
+    for record in records:
+        if not record:
+            continue
+        kind = record[0]
+        if kind == "#":
+            headers.append(record)
+        elif kind == "1":
+            entries[record.split(" ", 8)[8]] = record
+        elif kind == "2":
+            entries[record.split(" ", 9)[9]] = f"{record}\t{next(records, '')}"
+        elif kind == "u":
+            entries[record.split(" ", 10)[10]] = record
+        elif kind in "?!":
+            entries[record[2:]] = record
+    return headers, entries
+
+
+def render_porcelain_v2(headers: list[str], entries: dict[str, str]) -> str:
+    tracked = sorted(path for path, entry in entries.items() if entry[0] not in "?!")
+    untracked = sorted(path for path, entry in entries.items() if entry[0] in "?!")
+    return "".join(f"{line}\n" for line in [*headers, *(entries[p] for p in tracked + untracked)])
+
+
+def run_status(repo: git.Repo, paths: list[str] | None = None) -> tuple[list[str], dict[str, str]]:
+    args = [repo.git.GIT_PYTHON_GIT_EXECUTABLE, *STATUS_OPTIONS]
+    if paths:
+        args += ["--", *(f":(literal){path}" for path in paths)]
+    output = repo.git.execute(args, strip_newline_in_stdout=False)
+    return parse_porcelain_v2(output)
+
+
+class ChangeTracker(FileSystemEventHandler):
+    """Records the paths of a working tree that changed, using inotify through watchdog."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._changed: set[str] = set()
+        self._cookies: dict[str, threading.Event] = {}
+        self._observer = Observer()
+        self._observer.schedule(self, root, recursive=True)
+        self._observer.start()
+
+    def on_any_event(self, event: "FileSystemEvent") -> None:
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if not path:
+                continue
+            path = os.fsdecode(path)
+            with self._lock:
+                cookie = self._cookies.get(path)
+                if cookie is not None:
+                    cookie.set()
+                    continue
+            relative = os.path.relpath(path, self.root)
+            if relative == "." or relative.split(os.sep)[0] == ".git":
+                continue
+            with self._lock:
+                self._changed.add(relative.replace(os.sep, "/"))
+
+    def take(self) -> set[str] | None:
+        """Get the paths changed since the last call, or None if they cannot be trusted.
+
+        A cookie file is written first and its event awaited, so that every
+        change made before this call has been delivered.
+        """
+        if not self._observer.is_alive():
+            return None
+        cookie_path = os.path.join(self.root, ".git", f"mcp-status-cookie-{uuid.uuid4().hex}")
+        seen = threading.Event()
+        with self._lock:
+            self._cookies[cookie_path] = seen
+        try:
+            with open(cookie_path, "w"):
+                pass
+            synced = seen.wait(SYNC_TIMEOUT)
+        finally:
+            with self._lock:
+                del self._cookies[cookie_path]
+            try:
+                os.unlink(cookie_path)
+            except OSError:
+                pass
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        return changed if synced else None
+
+    def stop(self) -> None:
+        self._observer.stop()
+        self._observer.join()
+
+
+class FastStatus:
+    """Status of one working tree, refreshed incrementally between calls."""
+
+    def __init__(self, repo: git.Repo, track_changes: bool = False):
+        self.git_dir = repo.git_dir
+        self.tracker = None
+        self.full_refreshes = 0
+        self.incremental_refreshes = 0
+        self._lock = threading.Lock()
+        self._headers: list[str] = []
+        self._entries: dict[str, str] | None = None
+        self._fingerprint: tuple | None = None
+        root = repo.working_tree_dir
+        # The tracker syncs through a cookie file, which must be inside the watched tree
+        if track_changes and root and os.path.isdir(os.path.join(root, ".git")):
+            if Observer is None:
+                logger.warning("Install watchdog to track working tree changes for git_status")
+            else:
+                self.tracker = ChangeTracker(root)
+
+    def _git_fingerprint(self) -> tuple:
+        """State of the index, HEAD and refs that the cached entries depend on."""
+        stats = []
+        for name in ("index", "FETCH_HEAD"):
+            try:
+                info = os.stat(os.path.join(self.git_dir, name))
+                stats.append((info.st_mtime_ns, info.st_size, info.st_ino))
+            except OSError:
+                stats.append(None)
+        return (read_head_state(self.git_dir), *stats)
+
+    def status(self, repo: git.Repo) -> str:
+        with self._lock:
+            changed = self.tracker.take() if self.tracker is not None else None
+            if (
+                changed is None
+                or self._entries is None
+                or self._git_fingerprint() != self._fingerprint
+                or len(changed) > MAX_INCREMENTAL_PATHS
+            ):
+                self._headers, self._entries = run_status(repo)
+                self.full_refreshes += 1
+            elif changed:
+                self._headers, entries = run_status(repo, sorted(changed))
+                for path in list(self._entries):
+                    if any(path == p or path.startswith(p + "/") for p in changed):
+                        del self._entries[path]
+                self._entries.update(entries)
+                self.incremental_refreshes += 1
+            # git may have written refreshed stat data to the index
+            self._fingerprint = self._git_fingerprint()
+            return render_porcelain_v2(self._headers, self._entries)
+
+    def close(self) -> None:
+        if self.tracker is not None:
+            self.tracker.stop()
+
+
+class StatusCache:
+    """Bounded set of FastStatus objects keyed by git directory."""
+
+    def __init__(self, track_changes: bool = False, max_entries: int = DEFAULT_STATUS_CACHE_SIZE):
+        self.track_changes = track_changes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, FastStatus] = OrderedDict()
+
+    def get(self, repo: git.Repo) -> FastStatus:
+        with self._lock:
+            status = self._entries.get(repo.git_dir)
+            if status is not None:
+                self._entries.move_to_end(repo.git_dir)
+                return status
+            status = FastStatus(repo, self.track_changes)
+            self._entries[repo.git_dir] = status
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[1])
+        for entry in evicted:
+            entry.close()
+        return status
+
+    def invalidate(self, git_dir: str) -> None:
+        with self._lock:
+            status = self._entries.pop(git_dir, None)
+        if status is not None:
+            status.close()
+
+    def close(self) -> None:
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), OrderedDict()
+        for status in entries:
+            status.close()
@@ -0,0 +1,200 @@
+"""Watches the git directories of opened repositories for ref and index updates.
+
+With the optional ``watchdog`` package the watcher is woken by inotify (or the
+native API of the platform), otherwise it polls. Either way each wake-up is
+confirmed against a fingerprint of HEAD, the refs and the index, so a burst of
+events, or git writing and renaming lock files, reports an update once.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from .backend import common_git_dir, read_head_state
+
+try:
+    from watchdog.events import FileSystemEvent, FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional dependency
+    FileSystemEvent = None
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0
+# Events arriving within this time of each other are handled by one check
+DEBOUNCE_INTERVAL = 0.05
+MAX_WATCHED_REPOS = 64
+
+
+def _stat(path: str) -> tuple | None:
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return (info.st_mtime_ns, info.st_size, info.st_ino)
+
+
+def read_refs_state(git_dir: str) -> tuple:
+    """Fingerprint of HEAD and of every branch and tag of a repository."""
+    common_dir = common_git_dir(git_dir)
+    refs = []
+    for root, _, files in os.walk(os.path.join(common_dir, "refs")):
+        for name in files:
+            # git writes a ref to a lock file first and renames it into place
+            if not name.endswith(".lock"):
+                path = os.path.join(root, name)
+                refs.append((path, _stat(path)))
+    refs.sort()
+    return (
+        read_head_state(git_dir),
+        _stat(os.path.join(common_dir, "packed-refs")),
+        tuple(refs),
+    )
+
+
+def read_index_state(git_dir: str) -> tuple | None:
+    return _stat(os.path.join(git_dir, "index"))
+
+
+@dataclass
+class RepoChange:
+    path: Path
+    git_dir: str
+    refs_changed: bool
+    index_changed: bool
+
+
+@dataclass
+class _WatchedRepo:
+    git_dir: str
+    refs_state: tuple
+    index_state: tuple | None
+    handles: list
+    polled: bool
+
+
+class RepoWatcher(FileSystemEventHandler):
+    """Reports changes to HEAD, the refs and the index of watched repositories.
+
+    on_change is called from the watcher thread with a RepoChange for each
+    repository that changed.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[RepoChange], None],
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_repos: int = MAX_WATCHED_REPOS,
+        use_events: bool = True,
+    ):
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.max_repos = max_repos
+        self._lock = threading.Lock()
+        self._repos: OrderedDict[Path, _WatchedRepo] = OrderedDict()
+        self._wake = threading.Event()
+        self._closed = False
+        self._observer = None
+        if use_events and Observer is not None:
+            self._observer = Observer()
+            self._observer.start()
+        self._thread = threading.Thread(target=self._run, name="mcp-git-watcher", daemon=True)
+        self._thread.start()
+
+    def watch(self, repo_path: str | Path, git_dir: str) -> None:
+        """Start watching a repository, if it is not watched already."""
+        path = Path(repo_path).resolve()
+        with self._lock:
+            if path in self._repos:
+                self._repos.move_to_end(path)
+                return
+        repo = _WatchedRepo(git_dir, read_refs_state(git_dir), read_index_state(git_dir), [], True)
+        if self._observer is not None:
+            common_dir = common_git_dir(git_dir)
+            try:
+                repo.handles.append(self._observer.schedule(self, git_dir, recursive=False))
+                if os.path.realpath(common_dir) != os.path.realpath(git_dir):
+                    repo.handles.append(self._observer.schedule(self, common_dir, recursive=False))
+                refs_dir = os.path.join(common_dir, "refs")
+                if os.path.isdir(refs_dir):
+                    repo.handles.append(self._observer.schedule(self, refs_dir, recursive=True))
+                repo.polled = False
+            except OSError as e:
+                # For example when the inotify watch limit is reached
+                logger.warning(f"Polling {path} for changes: {e}")
+        with self._lock:
+            existing = self._repos.get(path)
+            self._repos[path] = repo
+            evicted = list(self._repos)[: max(len(self._repos) - self.max_repos, 0)]
+            evicted = [self._repos.pop(key) for key in evicted]
+        for entry in [existing, *evicted]:
+            if entry is not None:
+                self._unschedule(entry)
+        # Wake the thread in case it has to start polling
+        self._wake.set()
+
+    def unwatch(self, repo_path: str | Path) -> None:
+        with self._lock:
+            repo = self._repos.pop(Path(repo_path).resolve(), None)
+        if repo is not None:
+            self._unschedule(repo)
+
+    def watched(self) -> list[Path]:
+        with self._lock:
+            return list(self._repos)
+
+    def _unschedule(self, repo: _WatchedRepo) -> None:
+        for handle in repo.handles:
+            try:
+                self._observer.unschedule(handle)
+            except (KeyError, OSError):
+                pass
+
+    def on_any_event(self, event: "FileSystemEvent") -> None:
+        self._wake.set()
+
+    def check(self) -> list[RepoChange]:
+        """Compare every watched repository with its last fingerprint."""
+        with self._lock:
+            repos = list(self._repos.items())
+        changes = []
+        for path, repo in repos:
+            refs_state = read_refs_state(repo.git_dir)
+            index_state = read_index_state(repo.git_dir)
+            refs_changed = refs_state != repo.refs_state
+            index_changed = index_state != repo.index_state
+            if refs_changed or index_changed:
+                repo.refs_state, repo.index_state = refs_state, index_state
+                changes.append(RepoChange(path, repo.git_dir, refs_changed, index_changed))
+        return changes
+
+    def _run(self) -> None:
+        while not self._closed:
+            with self._lock:
+                polling = any(repo.polled for repo in self._repos.values())
+            woken = self._wake.wait(self.poll_interval if polling else None)
+            if self._closed:
+                break
+            if woken:
+                time.sleep(DEBOUNCE_INTERVAL)
+                self._wake.clear()
+            for change in self.check():
+                try:
+                    self.on_change(change)
+                except Exception:
+                    logger.exception(f"Handling a change of {change.path} failed")
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
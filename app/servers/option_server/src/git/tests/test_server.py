@@ -1,7 +1,38 @@
+import asyncio
+import gc
+import subprocess
+import threading
+import time
 import pytest
 from pathlib import Path
 import git
-from mcp_server_git.server import git_checkout
+from mcp.types import TextContent
+from mcp_server_git.backend import iter_commits
+from mcp_server_git.diff import DiffOptions
+from mcp_server_git.grep import GrepOptions
+from mcp_server_git.index import CommitIndex
+from mcp_server_git.scheduler import RepoScheduler
+from mcp_server_git.status import FastStatus
+from mcp_server_git.watcher import RepoWatcher
+from mcp_server_git.server import (
+    GitBatch,
+    GitTools,
+    RepoCache,
+    ResultCache,
+    git_batch,
+    git_checkout,
+    git_clone,
+    git_diff,
+    git_diff_unstaged,
+    git_grep,
+    git_log,
+    git_search_commits,
+    git_show,
+    git_status_porcelain,
+    find_repos,
+    repo_resource_path,
+    repo_resource_uri,
+)
 import shutil
 
 @pytest.fixture
@@ -27,4 +58,547 @@ def test_git_checkout_existing_branch(test_repository):
 def test_git_checkout_nonexistent_branch(test_repository):
 
     with pytest.raises(git.GitCommandError):
-        git_checkout(test_repository, "nonexistent-branch")
\ No newline at end of file
+        git_checkout(test_repository, "nonexistent-branch")
+
+def test_repo_cache_reuses_repo(test_repository):
+    cache = RepoCache()
+    repo = cache.get(test_repository.working_tree_dir)
+
+    assert cache.get(Path(test_repository.working_tree_dir) / ".") is repo
+    assert len(cache) == 1
+
+def test_repo_cache_invalidated_when_head_moves(test_repository):
+    cache = RepoCache()
+    repo = cache.get(test_repository.working_tree_dir)
+
+    test_repository.index.commit("second commit")
+    assert cache.get(test_repository.working_tree_dir) is not repo
+
+    repo = cache.get(test_repository.working_tree_dir)
+    test_repository.git.checkout("-b", "other")
+    assert cache.get(test_repository.working_tree_dir) is not repo
+
+def test_repo_cache_invalidated_when_git_dir_removed(test_repository):
+    cache = RepoCache()
+    cache.get(test_repository.working_tree_dir)
+
+    shutil.rmtree(test_repository.git_dir)
+    with pytest.raises(git.InvalidGitRepositoryError):
+        cache.get(test_repository.working_tree_dir)
+    assert len(cache) == 0
+
+def test_repo_cache_evicts_least_recently_used(tmp_path):
+    cache = RepoCache(max_entries=2)
+    paths = [tmp_path / name for name in ("a", "b", "c")]
+    for path in paths:
+        git.Repo.init(path)
+        cache.get(path)
+
+    assert len(cache) == 2
+
+def test_repo_cache_shares_repo_between_threads(test_repository):
+    for i in range(20):
+        test_repository.index.commit(f"commit {i}")
+    cache = RepoCache()
+    repo = cache.get(test_repository.working_tree_dir)
+    expected = git_log(repo)
+
+    repos, logs = [], []
+    def read():
+        shared = cache.get(test_repository.working_tree_dir)
+        repos.append(shared)
+        logs.append(git_log(shared))
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(shared is repo for shared in repos)
+    # The cat-file processes of the shared Repo answered every thread
+    assert logs == [expected] * 8
+    assert len(cache) == 1
+
+def _run_overlapping(scheduler, repo_paths, writes):
+    # Finalizers of Repo objects left by other tests wait for git processes and would stall the loop
+    gc.collect()
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*[
+            scheduler.run(path, write, work) for path, write in zip(repo_paths, writes)
+        ])
+
+    asyncio.run(main())
+    return peak
+
+def test_scheduler_runs_reads_concurrently(tmp_path):
+    scheduler = RepoScheduler(max_workers=4)
+    assert _run_overlapping(scheduler, [tmp_path] * 4, [False] * 4) == 4
+    scheduler.close()
+
+def test_scheduler_serializes_writes_per_repository(tmp_path):
+    scheduler = RepoScheduler(max_workers=4)
+    assert _run_overlapping(scheduler, [tmp_path] * 4, [True, False, True, True]) == 1
+    assert _run_overlapping(
+        scheduler, [tmp_path / "a", tmp_path / "b"], [True, True]
+    ) == 2
+    scheduler.close()
+
+def test_git_batch_runs_reads_concurrently_and_writes_in_order(tmp_path):
+    scheduler = RepoScheduler(max_workers=4)
+    events = []
+    lock = threading.Lock()
+
+    def run_tool(name, arguments):
+        with lock:
+            events.append(("start", name))
+        if name == GitTools.SHOW:
+            raise ValueError("bad revision")
+        time.sleep(0.05)
+        with lock:
+            events.append(("end", name))
+        return [TextContent(type="text", text=f"{name} in {arguments['repo_path']}")]
+
+    batch = GitBatch(repo_path=str(tmp_path), operations=[
+        {"tool": "git_status"},
+        {"tool": "git_log", "arguments": {"max_count": 1}},
+        {"tool": "git_commit", "arguments": {"message": "m"}},
+        {"tool": "git_show", "arguments": {"revision": "x"}},
+        {"tool": "git_batch"},
+    ])
+    results = asyncio.run(git_batch(scheduler, run_tool, batch))
+    scheduler.close()
+
+    assert [r.text.splitlines()[0] for r in results] == [
+        "1. git_status", "2. git_log", "3. git_commit", "4. git_show", "5. git_batch",
+    ]
+    assert results[0].text.endswith(f"git_status in {tmp_path}")
+    assert results[3].text.endswith("Error: bad revision")
+    assert results[4].text.endswith("Error: Batches cannot be nested")
+    # Both reads started before either finished, and the commit ran after them alone
+    assert [kind for kind, _ in events[:2]] == ["start", "start"]
+    assert events[4:6] == [("start", GitTools.COMMIT), ("end", GitTools.COMMIT)]
+
+def test_find_repos_opens_roots_concurrently(tmp_path):
+    scheduler = RepoScheduler(max_workers=4)
+    cache = RepoCache()
+    paths = []
+    for name in ("a", "b", "c"):
+        git.Repo.init(tmp_path / name)
+        paths.append(str(tmp_path / name))
+    (tmp_path / "plain").mkdir()
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def open_repo(path):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        try:
+            time.sleep(0.05)
+            return cache.get(path)
+        finally:
+            with lock:
+                active -= 1
+
+    gc.collect()
+    found = asyncio.run(find_repos(
+        scheduler, open_repo, [*paths, str(tmp_path / "plain"), str(tmp_path / "missing")]
+    ))
+    scheduler.close()
+
+    assert found == paths
+    assert peak > 1
+
+def test_iter_commits_matches_rev_list_order(test_repository):
+    root = test_repository.head.commit
+    left = test_repository.index.commit("left", parent_commits=[root], commit_date="2024-01-02T00:00:00")
+    right = test_repository.index.commit("right", parent_commits=[root], commit_date="2024-01-03T00:00:00")
+    test_repository.index.commit("merge", parent_commits=[left, right], commit_date="2024-01-04T00:00:00")
+
+    expected = test_repository.git.rev_list("HEAD").split()
+    assert [commit.hexsha for commit in iter_commits(test_repository)] == expected
+    assert len(git_log(test_repository, max_count=2)) == 2
+
+def test_git_show_renders_file_changes(test_repository):
+    repo_path = Path(test_repository.working_tree_dir)
+    (repo_path / "test.txt").write_text("changed\nlines\n")
+    (repo_path / "dir").mkdir()
+    (repo_path / "dir" / "new.txt").write_text("new\n")
+    (repo_path / "data.bin").write_bytes(b"\0binary")
+    test_repository.index.add(["test.txt", "dir/new.txt", "data.bin"])
+    test_repository.index.commit("change files")
+
+    result = git_show(test_repository, "HEAD")
+
+    assert "Message: change files" in result
+    assert "--- a/test.txt\n+++ b/test.txt\n@@ -1 +1,2 @@\n-test\n\\ No newline at end of file\n+changed\n+lines\n" in result
+    assert "diff --git a/dir/new.txt b/dir/new.txt\nnew file mode 100644\n" in result
+    assert "--- /dev/null\n+++ b/dir/new.txt\n@@ -0,0 +1 @@\n+new\n" in result
+    assert "Binary files /dev/null and b/data.bin differ" in result
+
+    test_repository.index.move(["dir/new.txt", "renamed.txt"])
+    test_repository.index.commit("rename")
+    assert "rename from dir/new.txt\nrename to renamed.txt\n" in git_show(test_repository, "HEAD")
+
+    root = git_show(test_repository, "HEAD~2")
+    assert "diff --git a/test.txt b/test.txt\nnew file mode 100644\n" in root
+
+def test_git_log_reuses_cat_file_processes(test_repository, monkeypatch):
+    cache = RepoCache()
+    repo = cache.get(test_repository.working_tree_dir)
+    git_show(repo, "HEAD")
+    git_log(repo)
+
+    spawned = []
+    original_init = subprocess.Popen.__init__
+    def record_popen(self, *args, **kwargs):
+        spawned.append(args)
+        original_init(self, *args, **kwargs)
+    monkeypatch.setattr(subprocess.Popen, "__init__", record_popen)
+
+    repo = cache.get(test_repository.working_tree_dir)
+    git_log(repo)
+    assert spawned == []
+    # Only the file changes of a commit are rendered by git diff
+    git_show(repo, "HEAD")
+    assert spawned and all(args[0][:2] == ["git", "diff"] for args in spawned)
+
+def test_git_log_filters_and_paginates(test_repository):
+    repo_path = Path(test_repository.working_tree_dir)
+    for i in range(5):
+        name = "docs.txt" if i % 2 else "code.txt"
+        (repo_path / name).write_text(str(i))
+        test_repository.index.add([name])
+        test_repository.index.commit(f"change {i}")
+
+    first_page = git_log(test_repository, max_count=2)
+    second_page = git_log(test_repository, max_count=2, skip=2)
+    assert [entry.splitlines()[-1] for entry in first_page + second_page] == [
+        "Message: change 4", "Message: change 3", "Message: change 2", "Message: change 1",
+    ]
+
+    docs = git_log(test_repository, max_count=10, paths=["docs.txt"])
+    assert [entry.splitlines()[-1] for entry in docs] == ["Message: change 3", "Message: change 1"]
+    assert len(git_log(test_repository, grep="change [24]")) == 2
+    assert git_log(test_repository, author="nobody-by-this-name") == []
+
+def test_commit_index_updates_incrementally(test_repository):
+    repo_path = Path(test_repository.working_tree_dir)
+    index = CommitIndex(test_repository)
+    assert index.update() == 1
+    assert index.update() == 0
+
+    (repo_path / "src").mkdir()
+    (repo_path / "src" / "app.py").write_text("print()")
+    test_repository.index.add(["src/app.py"])
+    author = git.Actor("Jane Doe", "jane@example.com")
+    test_repository.index.commit(
+        "Add the app", author=author, author_date="2024-02-10T12:00:00"
+    )
+    assert index.update() == 1
+
+    [commit] = index.search(path="src")
+    assert commit.message.strip() == "Add the app"
+    assert commit.paths == ["src/app.py"]
+    assert [c.oid for c in index.search(author="JANE", since="2024-01-01", until="2024-03-31")] == [commit.oid]
+    assert index.search(author="jane", until="2024-01-31") == []
+    assert index.search(path="src/app") == []
+
+def test_git_search_commits(test_repository):
+    results = git_search_commits(test_repository, message="initial")
+
+    assert len(results) == 1
+    assert "Message: initial commit" in results[0]
+    assert "Files:\n  test.txt\n" in results[0]
+    assert git_search_commits(test_repository, message="missing") == []
+
+def test_git_search_commits_is_scoped_to_revision(test_repository):
+    root = test_repository.head.commit
+    side = test_repository.index.commit("side change", parent_commits=[root], head=False)
+    test_repository.index.commit("main change")
+
+    assert len(git_search_commits(test_repository, message="change", revision=side.hexsha)) == 1
+    # The side commit is indexed now, but is not part of the history of HEAD
+    results = git_search_commits(test_repository, message="change")
+    assert len(results) == 1
+    assert "Message: main change" in results[0]
+    assert len(git_search_commits(test_repository, revision=side.hexsha, skip=1)) == 1
+
+def test_commit_search_reads_reachable_commits_once_per_tip(test_repository, monkeypatch):
+    for i in range(30):
+        test_repository.index.commit(f"change {i}")
+    index = CommitIndex(test_repository)
+    index.update()
+    assert len(index.search(revision="HEAD", skip=20)) == 11
+
+    spawned = []
+    original_init = subprocess.Popen.__init__
+    def record_popen(self, *args, **kwargs):
+        spawned.append(args[0])
+        original_init(self, *args, **kwargs)
+    monkeypatch.setattr(subprocess.Popen, "__init__", record_popen)
+
+    assert len(index.search(revision="HEAD", skip=20)) == 11
+    assert spawned == []
+    # After a new commit only the commits since the previous tip are walked
+    test_repository.index.commit("change 30")
+    index.update()
+    spawned.clear()
+    assert len(index.search(revision="HEAD", max_count=100)) == 32
+    assert [args[1] for args in spawned] == ["merge-base", "rev-list"]
+    assert "--not" in spawned[1]
+
+def test_git_grep_pages_and_scopes(test_repository):
+    repo_path = Path(test_repository.working_tree_dir)
+    (repo_path / "src").mkdir()
+    (repo_path / "src" / "a.py").write_text("".join(f"needle {i}\n" for i in range(5)))
+    (repo_path / "b.txt").write_text("Needle\n")
+    test_repository.index.add(["src/a.py", "b.txt"])
+    commit = test_repository.index.commit("add needles")
+    (repo_path / "b.txt").write_text("no match\n")
+
+    first = git_grep(test_repository, "needle", options=GrepOptions(max_matches=2))
+    assert first.startswith("src/a.py:1:needle 0\nsrc/a.py:2:needle 1\n")
+    assert "Call again with offset 2 to see more." in first
+    rest = git_grep(test_repository, "needle", options=GrepOptions(offset=2))
+    assert rest == "src/a.py:3:needle 2\nsrc/a.py:4:needle 3\nsrc/a.py:5:needle 4\n"
+
+    # A revision is searched instead of the working tree, and results are cached
+    cache = ResultCache()
+    options = GrepOptions(ignore_case=True)
+    result = git_grep(test_repository, "needle", "HEAD", ["*.txt"], options, cache)
+    assert result == "b.txt:1:Needle\n"
+    assert git_grep(test_repository, "needle", commit.hexsha, ["*.txt"], options, cache) == result
+    assert cache.hits == 1
+
+    assert git_grep(test_repository, "needle", options=GrepOptions(max_bytes=10)).count("\n") == 3
+    assert git_grep(test_repository, "missing") == "No matches\n"
+    with pytest.raises(git.GitCommandError):
+        git_grep(test_repository, "(")
+
+@pytest.fixture
+def large_commit(test_repository):
+    repo_path = Path(test_repository.working_tree_dir)
+    for i in range(5):
+        (repo_path / f"file{i}.txt").write_text("".join(f"line {n}\n" for n in range(1000)))
+    (repo_path / "image.png").write_bytes(b"\x89PNG\0" * 100)
+    test_repository.index.add([f"file{i}.txt" for i in range(5)] + ["image.png"])
+    test_repository.index.commit("vendor files")
+    return test_repository
+
+def test_git_show_modes(large_commit):
+    stat = git_show(large_commit, "HEAD", DiffOptions(mode="stat"))
+    assert " file0.txt | 1000 ++++" in stat
+    assert " image.png | Bin" in stat
+    assert " 6 files changed, 5000 insertions(+), 0 deletions(-)" in stat
+
+    names = git_show(large_commit, "HEAD", DiffOptions(mode="name-only"))
+    assert "A\tfile4.txt\nA\timage.png\n" in names
+    assert "+line" not in names
+
+def test_git_show_respects_budgets_and_paginates(large_commit):
+    options = DiffOptions(max_file_bytes=200, max_total_bytes=700, max_files=4)
+    result = git_show(large_commit, "HEAD", options)
+
+    assert "more bytes of this file's diff not shown" in result
+    assert "Showing files 1-2 of 6. Call again with file_offset 2 to see more." in result
+    assert "file2.txt" not in result
+
+    rest = git_show(large_commit, "HEAD", DiffOptions(file_offset=2, mode="name-only"))
+    assert "file2.txt" in rest and "file1.txt" not in rest
+
+def test_git_diff_bounds_working_tree_changes(large_commit):
+    repo_path = Path(large_commit.working_tree_dir)
+    for i in range(5):
+        (repo_path / f"file{i}.txt").write_text("changed\n" * 5000)
+
+    result = git_diff_unstaged(large_commit, DiffOptions(max_file_bytes=300, max_total_bytes=1000))
+    assert result.count("diff --git") < 5
+    assert "more bytes of this file's diff not shown" in result
+    assert "Call again with file_offset" in result
+
+    stat = git_diff(large_commit, "HEAD", DiffOptions(mode="stat"))
+    assert " file0.txt | 6000 " in stat
+
+    names = git_diff(large_commit, "HEAD~1..HEAD", DiffOptions(mode="name-only"))
+    assert names.startswith("A\tfile0.txt\n")
+
+def test_git_diff_renders_ranges_like_revisions_and_detects_renames(large_commit):
+    large_commit.git.mv("file0.txt", "moved.txt")
+    (Path(large_commit.working_tree_dir) / "file1.txt").write_text("edited\n")
+    large_commit.git.add("file1.txt")
+    large_commit.index.commit("move and edit")
+
+    range_diff = git_diff(large_commit, "HEAD~1..HEAD")
+    assert range_diff == git_diff(large_commit, "HEAD~1")
+    assert "diff --git a/file0.txt b/moved.txt\nsimilarity index 100%\nrename from file0.txt\nrename to moved.txt\n" in range_diff
+    assert "+line" not in range_diff
+
+    names = git_diff(large_commit, "HEAD~1..HEAD", DiffOptions(mode="name-only"))
+    # Renames are sorted by their destination path
+    assert names == "M\tfile1.txt\nR100\tfile0.txt\tmoved.txt\n"
+    stat = git_diff(large_commit, "HEAD~1..HEAD", DiffOptions(mode="stat"))
+    assert " file0.txt => moved.txt | 0 \n" in stat
+    # Pages split by file still pair both sides of a rename
+    first = git_diff(large_commit, "HEAD~1", DiffOptions(max_files=1))
+    assert first.startswith("diff --git a/file1.txt b/file1.txt\n")
+    assert "Call again with file_offset 1" in first
+    second = git_diff(large_commit, "HEAD~1", DiffOptions(file_offset=1))
+    assert second.startswith("diff --git a/file0.txt b/moved.txt\n")
+
+def test_result_cache_serves_immutable_show_and_diff(large_commit, monkeypatch):
+    cache = ResultCache()
+    show = git_show(large_commit, "HEAD", DiffOptions(mode="stat"), cache)
+    diff = git_diff(large_commit, "HEAD~1..HEAD", DiffOptions(), cache)
+    assert cache.misses == 2
+
+    def fail(*args, **kwargs):
+        raise AssertionError("rendered again")
+    monkeypatch.setattr("mcp_server_git.server.render_git_diff", fail)
+
+    head = large_commit.head.commit.hexsha
+    assert git_show(large_commit, head, DiffOptions(mode="stat"), cache) == show
+    assert git_diff(large_commit, f"{head}~1..{head}", DiffOptions(), cache) == diff
+    assert cache.hits == 2
+    with pytest.raises(AssertionError):
+        git_show(large_commit, "HEAD", DiffOptions(mode="name-only"), cache)
+
+def test_result_cache_evicts_to_size_budget():
+    cache = ResultCache(max_bytes=800)
+    for i in range(10):
+        cache.put(("show", str(i)), "x" * 100)
+
+    assert cache.current_bytes <= 800
+    assert cache.get(("show", "0")) is None
+    assert cache.get(("show", "9")) == "x" * 100
+    cache.put(("show", "big"), "x" * 101)
+    assert cache.get(("show", "big")) is None
+
+def test_git_status_porcelain(test_repository):
+    repo_path = Path(test_repository.working_tree_dir)
+    (repo_path / "test.txt").write_text("modified")
+    (repo_path / "new dir").mkdir()
+    (repo_path / "new dir" / "new.txt").write_text("new")
+
+    lines = git_status_porcelain(test_repository).splitlines()
+
+    assert lines[0].startswith("# branch.oid ")
+    assert any(line.startswith("1 .M ") and line.endswith(" test.txt") for line in lines)
+    assert lines[-1] == "? new dir/new.txt"
+
+def test_fast_status_tracks_changed_paths(test_repository):
+    pytest.importorskip("watchdog")
+    repo_path = Path(test_repository.working_tree_dir)
+    status = FastStatus(test_repository, track_changes=True)
+    try:
+        assert "test.txt" not in status.status(test_repository)
+        assert status.full_refreshes == 1
+
+        (repo_path / "test.txt").write_text("modified")
+        (repo_path / "other.txt").write_text("other")
+        result = status.status(test_repository)
+        assert status.incremental_refreshes == 1
+        assert " test.txt\n" in result and "? other.txt\n" in result
+
+        (repo_path / "other.txt").unlink()
+        assert "other.txt" not in status.status(test_repository)
+        assert status.full_refreshes == 1
+
+        # Staging changes the index, which needs a full status
+        test_repository.index.add(["test.txt"])
+        assert "1 M. " in status.status(test_repository)
+        assert status.full_refreshes == 2
+    finally:
+        status.close()
+
+def test_repo_resource_uri_round_trips(tmp_path):
+    repo_path = tmp_path / "my repo"
+    uri = repo_resource_uri(repo_path)
+    assert uri.startswith("git:///") and "%20" in uri
+    assert repo_resource_path(uri) == repo_path.resolve()
+
+@pytest.mark.parametrize("use_events", [False, True])
+def test_repo_watcher_reports_commits_and_index_writes(test_repository, use_events):
+    if use_events:
+        pytest.importorskip("watchdog")
+    repo_path = Path(test_repository.working_tree_dir)
+    changes = []
+    changed = threading.Event()
+
+    def on_change(change):
+        changes.append(change)
+        changed.set()
+
+    watcher = RepoWatcher(on_change, poll_interval=0.05, use_events=use_events)
+    try:
+        watcher.watch(repo_path, test_repository.git_dir)
+        assert watcher.watched() == [repo_path.resolve()]
+
+        (repo_path / "test.txt").write_text("changed")
+        test_repository.index.add(["test.txt"])
+        assert changed.wait(5)
+        assert not changes[-1].refs_changed and changes[-1].index_changed
+
+        changed.clear()
+        test_repository.index.commit("second commit")
+        assert changed.wait(5)
+        assert changes[-1].path == repo_path.resolve()
+        assert changes[-1].refs_changed
+
+        changed.clear()
+        test_repository.git.branch("other")
+        assert changed.wait(5)
+        assert changes[-1].refs_changed and not changes[-1].index_changed
+    finally:
+        watcher.close()
+
+def test_git_clone_partial_shallow_sparse(test_repository, tmp_path):
+    source = Path(test_repository.working_tree_dir)
+    for directory in ("wanted", "other"):
+        (source / directory).mkdir()
+        (source / directory / "file.txt").write_text(directory)
+    test_repository.index.add(["wanted/file.txt", "other/file.txt"])
+    test_repository.index.commit("add directories")
+    # Serving a partial clone must be allowed by the remote
+    with test_repository.config_writer() as config:
+        config.set_value("uploadpack", "allowFilter", "true")
+
+    progress = []
+    destination = tmp_path / "clone"
+    result = git_clone(
+        source.as_uri(),
+        str(destination),
+        depth=1,
+        filter_spec="blob:none",
+        single_branch=True,
+        sparse_paths=["wanted"],
+        progress=lambda done, total: progress.append(done),
+    )
+
+    assert result == f"Cloned {source.as_uri()} into {destination}"
+    assert (destination / "wanted" / "file.txt").read_text() == "wanted"
+    assert (destination / "test.txt").exists()
+    assert not (destination / "other").exists()
+    clone = git.Repo(destination)
+    assert clone.git.rev_list("--count", "--all") == "1"
+    assert clone.config_reader().get_value("remote \"origin\"", "partialclonefilter") == "blob:none"
+    clone.close()
+    assert progress and progress == sorted(progress)
+
+    with pytest.raises(ValueError):
+        git_clone("--upload-pack=touch /tmp/pwned", str(tmp_path / "bad"))
@@ -1,6 +1,8 @@
 from . import server
+from .pool import DEFAULT_PROFILE, DEFAULT_READERS, PROFILES, SYNCHRONOUS_MODES
 import asyncio
 import argparse
+import dataclasses
 
 
 def main():
@@ -9,9 +11,33 @@ def main():
     parser.add_argument('--db-path', 
                        default="./sqlite_mcp_server.db",
                        help='Path to SQLite database file')
+    parser.add_argument('--readers',
+                       type=int,
+                       default=DEFAULT_READERS,
+                       help='Number of read-only connections kept open (default: %(default)s)')
+    parser.add_argument('--profile',
+                       choices=sorted(PROFILES),
+                       default=DEFAULT_PROFILE,
+                       help='Connection tuning profile (default: %(default)s)')
+    parser.add_argument('--cache-size',
+                       type=int,
+                       help='Page cache size per connection in KiB, overriding the profile')
+    parser.add_argument('--mmap-size',
+                       type=int,
+                       help='Bytes of the database file to memory-map, overriding the profile')
+    parser.add_argument('--synchronous',
+                       choices=SYNCHRONOUS_MODES,
+                       help='PRAGMA synchronous mode of the writer, overriding the profile')
     
     args = parser.parse_args()
-    asyncio.run(server.main(args.db_path))
+    profile = PROFILES[args.profile]
+    overrides = {
+        "cache_size_kib": args.cache_size,
+        "mmap_size": args.mmap_size,
+        "synchronous": args.synchronous,
+    }
+    profile = dataclasses.replace(profile, **{key: value for key, value in overrides.items() if value is not None})
+    asyncio.run(server.main(args.db_path, args.readers, profile))
 
 
 # Optionally expose other important items at package level
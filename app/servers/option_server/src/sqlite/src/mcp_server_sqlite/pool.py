@@ -0,0 +1,95 @@
+import logging
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_READERS = 4
+
+@dataclass(frozen=True)
+class PragmaProfile:
+    """Per-connection tuning applied to every pooled connection"""
+    synchronous: str
+    cache_size_kib: int
+    mmap_size: int
+
+PROFILES = {
+    # fsync on every commit, small page cache, no memory mapping
+    "safe": PragmaProfile(synchronous="FULL", cache_size_kib=2 * 1024, mmap_size=0),
+    # WAL with synchronous=NORMAL stays consistent, a power loss may only drop the last commits
+    "balanced": PragmaProfile(synchronous="NORMAL", cache_size_kib=64 * 1024, mmap_size=256 * 1024 * 1024),
+    # no fsync at all, for scratch databases that can be rebuilt
+    "fast": PragmaProfile(synchronous="OFF", cache_size_kib=256 * 1024, mmap_size=1024 * 1024 * 1024),
+}
+DEFAULT_PROFILE = "balanced"
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+class ConnectionPool:
+    """Long-lived connections to one database: a single writer and read-only readers
+
+    The database is switched to WAL mode, so readers see the last committed
+    state and never wait for the writer. Connections keep their page cache and
+    parsed schema between queries.
+    """
+
+    def __init__(self, db_path: str, readers: int = DEFAULT_READERS, profile: PragmaProfile = PROFILES[DEFAULT_PROFILE]):
+        if profile.synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid synchronous mode: {profile.synchronous}")
+        self.db_path = db_path
+        self.profile = profile
+        self._write_lock = threading.Lock()
+        self._writer = self._connect(db_path)
+        journal_mode = self._writer.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode.lower() != "wal":
+            # An in-memory database cannot use WAL, nor be opened by other connections
+            logger.warning(f"Database uses journal mode {journal_mode}, queries share the writer connection")
+            readers = 0
+        self._writer.execute(f"PRAGMA synchronous={profile.synchronous.upper()}")
+
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self.reader_count = readers
+        for _ in range(readers):
+            self._readers.put(self._connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True))
+        logger.debug(f"Opened connection pool with {readers} readers for {db_path}")
+
+    def _connect(self, database: str, uri: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(database, uri=uri, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # A negative cache_size is in KiB instead of pages
+        conn.execute(f"PRAGMA cache_size=-{int(self.profile.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.profile.mmap_size)}")
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection, waiting for one to be free"""
+        if not self.reader_count:
+            with self.writer() as conn:
+                yield conn
+            return
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Borrow the writer connection, which is used by one thread at a time"""
+        with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    def close(self) -> None:
+        for _ in range(self.reader_count):
+            self._readers.get().close()
+        with self._write_lock:
+            self._writer.close()
@@ -1,7 +1,9 @@
 import os
 import sys
 import sqlite3
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing
 from pathlib import Path
 from pydantic import AnyUrl
@@ -12,6 +14,8 @@ from mcp.server.lowlevel import Server, NotificationOptions
 from mcp.server.stdio import stdio_server
 import mcp.types as types
 
+from .pool import DEFAULT_PROFILE, DEFAULT_READERS, PROFILES, ConnectionPool, PragmaProfile
+
 
 # reconfigure UnicodeEncodeError prone default (i.e. windows-1252) to utf-8
 if sys.platform == "win32" and os.environ.get('PYTHONIOENCODING') is None:
@@ -103,19 +107,31 @@ The provided XML tags are for the assistants understanding. Implore to make all
 Start your first message fully in character with something like "Oh, Hey there! I see you've chosen the topic {topic}. Let's get started! 🚀"
 """
 
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER')
+
+def _is_write(query: str) -> bool:
+    return query.strip().upper().startswith(WRITE_PREFIXES)
+
 class SqliteDatabase:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, readers: int = DEFAULT_READERS, profile: PragmaProfile = PROFILES[DEFAULT_PROFILE]):
         self.db_path = str(Path(db_path).expanduser())
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._init_database()
+        self.pool = self._init_database(readers, profile)
+        # One thread per reader connection, and a single thread that runs writes in order
+        self._read_executor = ThreadPoolExecutor(max(self.pool.reader_count, 1), thread_name_prefix="sqlite-reader")
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="sqlite-writer")
         self.insights: list[str] = []
 
-    def _init_database(self):
-        """Initialize connection to the SQLite database"""
-        logger.debug("Initializing database connection")
-        with closing(sqlite3.connect(self.db_path)) as conn:
-            conn.row_factory = sqlite3.Row
-            conn.close()
+    def _init_database(self, readers: int, profile: PragmaProfile) -> ConnectionPool:
+        """Initialize the pooled connections to the SQLite database"""
+        logger.debug(f"Initializing database connection pool with {readers} readers")
+        return ConnectionPool(self.db_path, readers, profile)
+
+    def close(self):
+        """Wait for running queries and close all pooled connections"""
+        self._read_executor.shutdown(wait=True)
+        self._write_executor.shutdown(wait=True)
+        self.pool.close()
 
     def _synthesize_memo(self) -> str:
         """Synthesizes business insights into a formatted memo"""
@@ -136,20 +152,29 @@ class SqliteDatabase:
         logger.debug("Generated basic memo format")
         return memo
 
-    def _execute_query(self, query: str, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
-        """Execute a SQL query and return results as a list of dictionaries"""
+    def _execute_query(self, query: str, params: dict[str, Any] | None = None, write: bool | None = None) -> list[dict[str, Any]]:
+        """Execute a SQL query and return results as a list of dictionaries
+
+        Writes go to the writer connection and reads to a read-only reader. If
+        write is not given, it is guessed from the statement.
+        """
         logger.debug(f"Executing query: {query}")
+        if write is None:
+            write = _is_write(query)
         try:
-            with closing(sqlite3.connect(self.db_path)) as conn:
-                conn.row_factory = sqlite3.Row
+            with (self.pool.writer() if write else self.pool.reader()) as conn:
                 with closing(conn.cursor()) as cursor:
                     if params:
                         cursor.execute(query, params)
                     else:
                         cursor.execute(query)
 
-                    if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER')):
+                    if write:
+                        # A statement with RETURNING also produces rows
+                        results = [dict(row) for row in cursor.fetchall()] if cursor.description else None
                         conn.commit()
+                        if results is not None:
+                            return results
                         affected = cursor.rowcount
                         logger.debug(f"Write query affected {affected} rows")
                         return [{"affected_rows": affected}]
@@ -161,10 +186,18 @@ class SqliteDatabase:
             logger.error(f"Database error executing query: {e}")
             raise
 
-async def main(db_path: str):
+    async def execute_query(self, query: str, params: dict[str, Any] | None = None, write: bool | None = None) -> list[dict[str, Any]]:
+        """Execute a SQL query in a worker thread, so the event loop keeps serving other requests"""
+        if write is None:
+            write = _is_write(query)
+        executor = self._write_executor if write else self._read_executor
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._execute_query, query, params, write)
+
+async def main(db_path: str, readers: int = DEFAULT_READERS, profile: PragmaProfile = PROFILES[DEFAULT_PROFILE]):
     logger.info(f"Starting SQLite MCP Server with DB path: {db_path}")
 
-    db = SqliteDatabase(db_path)
+    db = SqliteDatabase(db_path, readers, profile)
     server = Server("sqlite-manager")
 
     # Register handlers
@@ -314,7 +347,7 @@ async def main(db_path: str):
         """Handle tool execution requests"""
         try:
             if name == "list_tables":
-                results = db._execute_query(
+                results = await db.execute_query(
                     "SELECT name FROM sqlite_master WHERE type='table'"
                 )
                 return [types.TextContent(type="text", text=str(results))]
@@ -322,7 +355,7 @@ async def main(db_path: str):
             elif name == "describe_table":
                 if not arguments or "table_name" not in arguments:
                     raise ValueError("Missing table_name argument")
-                results = db._execute_query(
+                results = await db.execute_query(
                     f"PRAGMA table_info({arguments['table_name']})"
                 )
                 return [types.TextContent(type="text", text=str(results))]
@@ -345,19 +378,19 @@ async def main(db_path: str):
             if name == "read_query":
                 if not arguments["query"].strip().upper().startswith("SELECT"):
                     raise ValueError("Only SELECT queries are allowed for read_query")
-                results = db._execute_query(arguments["query"])
+                results = await db.execute_query(arguments["query"], write=False)
                 return [types.TextContent(type="text", text=str(results))]
 
             elif name == "write_query":
                 if arguments["query"].strip().upper().startswith("SELECT"):
                     raise ValueError("SELECT queries are not allowed for write_query")
-                results = db._execute_query(arguments["query"])
+                results = await db.execute_query(arguments["query"], write=True)
                 return [types.TextContent(type="text", text=str(results))]
 
             elif name == "create_table":
                 if not arguments["query"].strip().upper().startswith("CREATE TABLE"):
                     raise ValueError("Only CREATE TABLE statements are allowed")
-                db._execute_query(arguments["query"])
+                await db.execute_query(arguments["query"], write=True)
                 return [types.TextContent(type="text", text="Table created successfully")]
 
             else:
@@ -368,20 +401,23 @@ async def main(db_path: str):
         except Exception as e:
             return [types.TextContent(type="text", text=f"Error: {str(e)}")]
 
-    async with stdio_server() as (read_stream, write_stream):
-        logger.info("Server running with stdio transport")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="sqlite",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            logger.info("Server running with stdio transport")
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="sqlite",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        db.close()
 
 class ServerWrapper():
     """A wrapper to compat with mcp[cli]"""
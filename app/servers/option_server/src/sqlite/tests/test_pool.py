@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from mcp_server_sqlite.pool import PROFILES, ConnectionPool, PragmaProfile
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "test.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    return str(path)
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path, readers=2, profile=PROFILES["safe"])
+    yield pool
+    pool.close()
+
+
+def pragma(conn: sqlite3.Connection, name: str):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_database_is_switched_to_wal_with_the_profile_pragmas(pool, db_path):
+    with pool.writer() as conn:
+        assert pragma(conn, "journal_mode") == "wal"
+        # FULL
+        assert pragma(conn, "synchronous") == 2
+        assert pragma(conn, "cache_size") == -2 * 1024
+        assert pragma(conn, "mmap_size") == 0
+
+    with pool.reader() as conn:
+        assert pragma(conn, "journal_mode") == "wal"
+        assert pragma(conn, "cache_size") == -2 * 1024
+
+    # WAL mode is stored in the database file
+    with sqlite3.connect(db_path) as conn:
+        assert pragma(conn, "journal_mode") == "wal"
+
+
+def test_invalid_synchronous_mode_is_rejected(db_path):
+    with pytest.raises(ValueError, match="Invalid synchronous mode"):
+        ConnectionPool(db_path, profile=PragmaProfile("SOMETIMES; DROP TABLE items", 1024, 0))
+
+
+def test_readers_reject_writes(pool):
+    with pool.reader() as conn:
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            conn.execute("INSERT INTO items (name) VALUES ('a')")
+
+
+def test_readers_see_the_last_commit(pool):
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO items (name) VALUES ('a')")
+        conn.commit()
+        conn.execute("INSERT INTO items (name) VALUES ('b')")
+        # An open write transaction neither blocks readers nor shows them its rows
+        with pool.reader() as reader:
+            assert [row["name"] for row in reader.execute("SELECT name FROM items")] == ["a"]
+        conn.commit()
+
+
+def test_writer_is_used_by_one_thread_at_a_time(pool):
+    active = []
+    overlaps = []
+
+    def write(i):
+        with pool.writer() as conn:
+            active.append(i)
+            overlaps.append(len(active) > 1)
+            conn.execute("INSERT INTO items (name) VALUES (?)", (str(i),))
+            time.sleep(0.01)
+            conn.commit()
+            active.remove(i)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [False] * 8
+    with pool.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 8
+
+
+def test_failed_write_is_rolled_back(pool):
+    with pytest.raises(sqlite3.IntegrityError):
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO items (id, name) VALUES (1, 'a')")
+            conn.execute("INSERT INTO items (id, name) VALUES (1, 'b')")
+
+    with pool.writer() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+
+def test_in_memory_database_shares_the_writer():
+    pool = ConnectionPool(":memory:", readers=2)
+    try:
+        assert pool.reader_count == 0
+        with pool.writer() as writer:
+            pass
+        with pool.reader() as conn:
+            assert conn is writer
+    finally:
+        pool.close()
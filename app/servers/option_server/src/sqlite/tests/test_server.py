@@ -0,0 +1,98 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from mcp_server_sqlite.server import SqliteDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SqliteDatabase(str(tmp_path / "test.db"), readers=2)
+    asyncio.run(db.execute_query("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    yield db
+    db.close()
+
+
+def record_borrowed_connections(db: SqliteDatabase) -> list[tuple[str, str]]:
+    """Record which connection kind each query borrows, and on which thread."""
+    calls = []
+    for kind in ("reader", "writer"):
+        def borrow(kind=kind, original=getattr(db.pool, kind)):
+            calls.append((kind, threading.current_thread().name))
+            return original()
+        setattr(db.pool, kind, borrow)
+    return calls
+
+
+def test_selects_run_on_reader_threads_and_writes_on_the_writer(db):
+    calls = record_borrowed_connections(db)
+
+    async def run():
+        await db.execute_query("SELECT * FROM items")
+        await db.execute_query("  insert INTO items (name) VALUES ('a')")
+        await db.execute_query("SELECT * FROM items", write=True)
+
+    asyncio.run(run())
+    assert [(kind, thread.rpartition("_")[0]) for kind, thread in calls] == [
+        ("reader", "sqlite-reader"),
+        ("writer", "sqlite-writer"),
+        ("writer", "sqlite-writer"),
+    ]
+
+
+def test_writes_are_committed(db):
+    result = asyncio.run(db.execute_query(
+        "INSERT INTO items (name) VALUES (:name)", {"name": "a"}
+    ))
+    assert result == [{"affected_rows": 1}]
+
+    # Another connection sees the row, so it was committed
+    with sqlite3.connect(db.db_path) as conn:
+        assert conn.execute("SELECT name FROM items").fetchall() == [("a",)]
+
+
+def test_returning_rows_come_back(db):
+    result = asyncio.run(db.execute_query(
+        "INSERT INTO items (name) VALUES ('a'), ('b') RETURNING id, name"
+    ))
+    assert result == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+    assert asyncio.run(db.execute_query("SELECT COUNT(*) AS count FROM items")) == [{"count": 2}]
+
+
+def test_reads_during_a_write_see_committed_data(db):
+    asyncio.run(db.execute_query("INSERT INTO items (name) VALUES ('committed')"))
+    writing = threading.Event()
+    release = threading.Event()
+
+    def write():
+        with db.pool.writer() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('pending')")
+            writing.set()
+            release.wait()
+            conn.commit()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    writing.wait()
+
+    async def run():
+        # Queued behind the open write on the writer thread
+        queued = asyncio.ensure_future(db.execute_query("INSERT INTO items (name) VALUES ('queued')"))
+        try:
+            during = await asyncio.wait_for(db.execute_query("SELECT name FROM items ORDER BY id"), 5)
+            assert not queued.done()
+        finally:
+            release.set()
+        await queued
+        after = await db.execute_query("SELECT name FROM items ORDER BY id")
+        return during, after
+
+    try:
+        during, after = asyncio.run(run())
+    finally:
+        release.set()
+        thread.join()
+    assert during == [{"name": "committed"}]
+    assert after == [{"name": "committed"}, {"name": "pending"}, {"name": "queued"}]